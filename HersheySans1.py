@@ -1,3 +1,6 @@
+from viewport import clip_string, ink_bounds
+
+
 class HersheySans1:
     name = 'HersheySans1'
     is_monospace = False
@@ -225,6 +228,9 @@ class HersheySans1:
     }
     _kern = {
     }
+    # Ink bounds of every glyph in font units, for rejecting glyphs outside a clip rectangle.
+    # (Only the outermost iterable of a comprehension can see class attributes.)
+    _bounds, _ink = ink_bounds({ch: pls for ch, (adv, pls) in _glyphs.items()})
 
     def __init__(self):
         self.stroke_width = 1.0
@@ -274,7 +280,9 @@ class HersheySans1:
     def get_string_length(self, line):
         return sum(self.get_length(char) for char in line)
 
-    def get_string(self, line):
+    def get_string(self, line, clip=None):
+        if clip is not None:
+            return self.get_clipped_string(line, clip)
         x_offset = 0
         out = []
         for char in line:
@@ -287,6 +295,11 @@ class HersheySans1:
             x_offset += self.get_length(char) * self.scale
         return out
 
+    def get_clipped_string(self, line, clip):
+        # clip = (min_x, min_y, max_x, max_y) in get_string() coordinates (y up), see viewport.clip_string().
+        return clip_string(line, clip, self.scale, self.get_length, self.get_char, self._bounds, self._ink, flip_y=True)
+
+
 # Factory for adapter modules
 def get_font():
     return HersheySans1()
@@ -0,0 +1,312 @@
+"""
+Font registry: finds the vector fonts by name and loads each one on first use.
+
+Every font handed out by the registry follows the glyph protocol of the Romans
+fonts: glyphs are keyed by ordinal, in font units with y up and the baseline at 0;
+`l` and `t` hold the advances and the stroke paths; `scale` multiplies font units;
+and get_string(line, clip=None), get_string_length(line), get_length(code) and
+get_char(code) behave like those of Romans. Kerned fonts (Romans2 and every
+StrokeFont) also have the kerning pairs `k` and the `kerning` switch. Fonts with
+another em square than the Hershey grid of Romans (32 units) say so in `units_per_em`.
+
+    from font_registry import get_font, available_fonts
+
+    available_fonts()                      # ['hersheysans1', 'romans', 'romans2', ...]
+    font = get_font('romans2', size=10)    # a SizedFont view, 10 units per em
+    paths = font.get_string("Part 12")
+
+The built-in fonts are Python modules and are only imported when requested;
+HersheySans1 is adapted to the protocol (ordinals instead of characters, y up).
+More Hershey faces can be imported in bulk from .jhf files into a compact zip
+archive (fonts/hershey.zip by default) that stores every face as one deflated
+member of Romans-style glyph strings. Listing the archive costs nothing at startup;
+a face is decompressed and parsed the first time it is requested.
+
+    python font_registry.py import hershey/*.jhf
+    python font_registry.py list
+"""
+import argparse
+import importlib
+import os
+import threading
+import zipfile
+from functools import partial
+
+from kerned_font import KernedFont
+from sized_font import SizedFont
+from viewport import ink_bounds
+
+DEFAULT_ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts', 'hershey.zip')
+HERSHEY_UNITS_PER_EM = 32.0
+
+
+class StrokeFont(KernedFont):
+    """
+    A stroke font built from glyph data: {code: (advance, paths)} in font units with
+    y up, and optional kerning pairs {(code, code): kern}. It shares the string layout of
+    Romans2 (KernedFont), so it has the same methods and works with SizedFont,
+    string_metrics and outline.
+    """
+
+    def __init__(self, glyphs, kerning=None, units_per_em=HERSHEY_UNITS_PER_EM, name=None, default_advance=0.0):
+        # Fills the tables that KernedFont lays strings out from, see kerned_font.py.
+        self.name = name
+        self.units_per_em = units_per_em
+        self.default_advance = default_advance
+        self.scale = 1.0
+        self.f = {}
+        self.l = {}
+        self.t = {}
+        self.k = kerning or {}
+        self.kerning = True
+        for c, (advance, paths) in glyphs.items():
+            self.l[c] = float(advance)
+            self.t[c] = [[(float(x), float(y)) for x, y in path] for path in paths if path]
+        self.b, self.ink = ink_bounds(self.t) # Ink bounds, for clipping
+
+    def __repr__(self):
+        return f"StrokeFont({self.name!r}, {len(self.t)} glyphs)"
+
+
+# --- Glyph strings: the "advance;x,y x,y;x,y ..." format of the Romans fonts ---
+
+def format_glyph(advance, paths):
+    """Formats one glyph as a Romans-style glyph string."""
+    return ";".join([f"{advance:g}"] + [" ".join(f"{x:g},{y:g}" for x, y in path) for path in paths])
+
+
+def parse_glyph(data):
+    """Parses a Romans-style glyph string into (advance, paths)."""
+    fields = data.split(';')
+    paths = []
+    for path_data in fields[1:]:
+        path = []
+        for point_str in path_data.split():
+            x, y = point_str.split(',')
+            path.append((float(x), float(y)))
+        if path:
+            paths.append(path)
+    return float(fields[0]), paths
+
+
+# --- Hershey .jhf import ---
+
+def _jhf_records(text):
+    """Splits .jhf text into glyph records, joining records that continue on the next lines."""
+    records = []
+    needed = 0
+    for line in text.splitlines():
+        if records and len(records[-1]) < needed:
+            records[-1] += line
+        elif line.strip():
+            needed = 8 + 2 * int(line[5:8])
+            records.append(line)
+    return records
+
+
+def parse_jhf(text, first_code=32):
+    """
+    Parses a Hershey .jhf font into {code: (advance, paths)} in the units of Romans.
+
+    Every record holds a glyph number (5 columns), a vertex count (3 columns) and
+    that many coordinate pairs, each coordinate being a character offset from 'R'.
+    The first pair gives the left and right side bearings and " R" lifts the pen.
+    Records are in character order starting at `first_code` (the space). Hershey y
+    runs down with the baseline at 9, so points become (x - left, 9 - y).
+    """
+    glyphs = {}
+    for index, record in enumerate(_jhf_records(text)):
+        count = int(record[5:8])
+        data = record[8:8 + 2 * count]
+        left, right = ord(data[0]) - 82, ord(data[1]) - 82
+        paths = []
+        path = []
+        for i in range(2, len(data) - 1, 2):
+            if data[i:i + 2] == ' R':
+                if path:
+                    paths.append(path)
+                path = []
+            else:
+                path.append((ord(data[i]) - 82 - left, 9 - (ord(data[i + 1]) - 82)))
+        if path:
+            paths.append(path)
+        glyphs[first_code + index] = (right - left, paths)
+    return glyphs
+
+
+def format_face(glyphs):
+    """Formats {code: (advance, paths)} as the text of one archive member, one glyph per line."""
+    return "".join(f"{code:04X} {format_glyph(*glyphs[code])}\n" for code in sorted(glyphs))
+
+
+def parse_face(text):
+    """Parses the text of one archive member back into {code: (advance, paths)}."""
+    glyphs = {}
+    for line in text.splitlines():
+        if line:
+            code, data = line.split(' ', 1)
+            glyphs[int(code, 16)] = parse_glyph(data)
+    return glyphs
+
+
+def import_jhf(jhf_files, archive=DEFAULT_ARCHIVE, reserved=()):
+    """
+    Converts .jhf files into faces of the archive, named after the files (romant.jhf
+    -> 'romant'). Faces already in the archive are replaced; names in `reserved`
+    (the built-in fonts) get a '-jhf' suffix. The archive is rewritten atomically.
+    Returns the imported face names.
+    """
+    faces = {}
+    if os.path.exists(archive):
+        with zipfile.ZipFile(archive) as existing:
+            for member in existing.namelist():
+                faces[member[:-len('.txt')]] = existing.read(member)
+
+    imported = []
+    for jhf_file in jhf_files:
+        name = os.path.splitext(os.path.basename(jhf_file))[0].lower()
+        if name in reserved:
+            print(f"  - Warning: '{name}' is a built-in font; importing {jhf_file} as '{name}-jhf'")
+            name += '-jhf'
+        with open(jhf_file, 'r', encoding='latin-1') as f:
+            faces[name] = format_face(parse_jhf(f.read())).encode('ascii')
+        imported.append(name)
+
+    os.makedirs(os.path.dirname(os.path.abspath(archive)), exist_ok=True)
+    tmp_path = archive + '.tmp'
+    with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as out:
+        for name in sorted(faces):
+            out.writestr(name + '.txt', faces[name])
+    os.replace(tmp_path, archive)
+    return imported
+
+
+# --- Loaders ---
+
+def load_archive_face(archive, name):
+    """Loads one face of a font archive as a StrokeFont."""
+    with zipfile.ZipFile(archive) as fonts:
+        text = fonts.read(name + '.txt').decode('ascii')
+    return StrokeFont(parse_face(text), units_per_em=HERSHEY_UNITS_PER_EM, name=name)
+
+
+def adapt_hershey_sans(font):
+    """
+    Adapts a HersheySans1-style font (glyphs keyed by character, y down, fixed
+    default advance) to a StrokeFont with the common glyph protocol.
+    """
+    glyphs = {ord(ch): (advance, [[(x, -y) for x, y in path] for path in paths])
+              for ch, (advance, paths) in font._glyphs.items()}
+    kerning = {(ord(a), ord(b)): k for (a, b), k in font._kern.items()}
+    return StrokeFont(glyphs, kerning, units_per_em=font._units_per_em, name=font.name,
+                      default_advance=font._default_adv)
+
+
+def _load_module_font(module_name, class_name, adapter=None):
+    font = getattr(importlib.import_module(module_name), class_name)()
+    return adapter(font) if adapter else font
+
+
+BUILTIN_FONTS = {
+    'romans': partial(_load_module_font, 'romans_font', 'Romans'),
+    'romans2': partial(_load_module_font, 'romans2_font', 'Romans2'),
+    'hersheysans1': partial(_load_module_font, 'HersheySans1', 'HersheySans1', adapt_hershey_sans),
+}
+
+
+class FontRegistry:
+    """
+    Maps font names to loaders and keeps every font once it has been loaded.
+    Loading is thread-safe; the fonts themselves are shared, so use the `size`
+    argument of get() (a SizedFont view) rather than changing their `scale`.
+    """
+
+    def __init__(self, archives=(DEFAULT_ARCHIVE,)):
+        self._loaders = dict(BUILTIN_FONTS)
+        self._fonts = {}
+        self._lock = threading.Lock()
+        for archive in archives:
+            self.add_archive(archive)
+
+    def register(self, name, loader):
+        """Registers (or replaces) a font name with a function that creates the font."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._fonts.pop(name, None)
+
+    def add_archive(self, archive):
+        """Registers the faces of a font archive without loading them. Missing archives are ignored."""
+        if not os.path.exists(archive):
+            return
+        with zipfile.ZipFile(archive) as fonts:
+            names = [member[:-len('.txt')] for member in fonts.namelist() if member.endswith('.txt')]
+        for name in names:
+            if name not in self._loaders:
+                self.register(name, partial(load_archive_face, archive, name))
+
+    def names(self):
+        """Names of all registered fonts, loaded or not."""
+        return sorted(self._loaders)
+
+    def __contains__(self, name):
+        return name in self._loaders
+
+    def get(self, name, size=None):
+        """
+        Returns the font registered as `name`, loading it on first use. With `size`,
+        returns a SizedFont view scaled so that the font's em square is `size` units.
+        """
+        font = self._fonts.get(name)
+        if font is None:
+            with self._lock:
+                font = self._fonts.get(name)
+                if font is None:
+                    loader = self._loaders.get(name)
+                    if loader is None:
+                        raise KeyError(f"unknown font {name!r}; available: {', '.join(self.names())}")
+                    font = self._fonts[name] = loader()
+        if size is None:
+            return font
+        return SizedFont(font, size / getattr(font, 'units_per_em', HERSHEY_UNITS_PER_EM))
+
+
+_registry = None
+
+
+def get_registry():
+    """Returns the default registry (built-in fonts and the default archive), creating it on first use."""
+    global _registry
+    if _registry is None:
+        _registry = FontRegistry()
+    return _registry
+
+
+def get_font(name, size=None):
+    """Returns a font from the default registry; see FontRegistry.get()."""
+    return get_registry().get(name, size)
+
+
+def available_fonts():
+    """Names of the fonts in the default registry."""
+    return get_registry().names()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lists the registered fonts or imports Hershey .jhf files.")
+    parser.add_argument("command", choices=["list", "import"])
+    parser.add_argument("files", nargs="*", help=".jhf files to import")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE, help=f"font archive (default: {DEFAULT_ARCHIVE})")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        if not args.files:
+            parser.error("import needs at least one .jhf file")
+        names = import_jhf(args.files, args.archive, reserved=BUILTIN_FONTS)
+        print(f"Imported {len(names)} face(s) into {args.archive}: {', '.join(names)}")
+    else:
+        for name in FontRegistry((args.archive,)).names():
+            print(name)
+
+
+if __name__ == "__main__":
+    main()
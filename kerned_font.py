@@ -0,0 +1,78 @@
+"""
+The string layout shared by the kerned stroke fonts (Romans2, font_registry.StrokeFont).
+
+KernedFont holds no glyphs. A subclass fills the tables and the methods below lay
+out strings from them:
+
+    l       {code: advance} in font units
+    t       {code: paths}, each path a list of (x, y) points in font units, y up
+    b, ink  ink bounds of the glyphs, from viewport.ink_bounds(t)
+    k       kerning pairs {(code, code): kern}, assigned as a whole
+    scale, kerning, default_advance (advance of characters without a glyph)
+
+It lives in its own module so that the font registry can subclass it without
+importing the glyph data of any font.
+"""
+from types import MappingProxyType
+
+from viewport import clip_string
+
+
+class KernedFont:
+    default_advance = 0 # Advance of characters without a glyph
+
+    @property
+    def k(self):
+        # Kerning pairs {(a, b): kern}, read-only: assign a new table to change them.
+        return self._k
+
+    @k.setter
+    def k(self, pairs):
+        # The pairs are also grouped by their first character, {a: {b: kern}}: walking a string
+        # then takes one lookup per character instead of building and hashing a tuple per pair.
+        # Both tables are only built here, so they cannot disagree.
+        kern_after = {}
+        for (a, b), kern in pairs.items():
+            kern_after.setdefault(a, {})[b] = kern
+        self._k = MappingProxyType(dict(pairs))
+        self._kern_after = kern_after
+        self._min_kern = min(self._k.values(), default=0)
+
+    def get_length(self, c): return self.l.get(c, self.default_advance) * self.scale
+    def get_kerning(self, a, b): return self.k.get((a, b), 0) * self.scale if self.kerning else 0
+    def get_string_length(self, line):
+        l, d = self.l, self.default_advance
+        if not self.kerning:
+            return sum(l.get(ord(char), d) for char in line) * self.scale
+        pairs = self._kern_after
+        length = 0
+        row = None # Kerning pairs starting with the previous character
+        for char in line:
+            c = ord(char)
+            length += l.get(c, d)
+            if row: length += row.get(c, 0)
+            row = pairs.get(c)
+        return length * self.scale
+    def get_char(self, c): return self.t.get(c)
+    def get_string(self, line, clip=None):
+        if clip is not None: return self.get_clipped_string(line, clip)
+        s = self.scale
+        l, t, d = self.l, self.t, self.default_advance
+        pairs = self._kern_after if self.kerning else {}
+        x = 0
+        out = []
+        row = None
+        for char in line:
+            c = ord(char)
+            if row: x += row.get(c, 0) * s
+            row = pairs.get(c)
+            ch = t.get(c)
+            if ch:
+                out.extend([(p[0] * s + x, p[1] * s) for p in path] for path in ch)
+            x += l.get(c, d) * s
+        return out
+    def get_clipped_string(self, line, clip):
+        # clip = (min_x, min_y, max_x, max_y) in get_string() coordinates, see viewport.clip_string().
+        kern_after = self._kern_after if self.kerning else None
+        return clip_string(map(ord, line), clip, self.scale, lambda c: self.l.get(c, self.default_advance), self.t.get, self.b, self.ink,
+                           kern_after, self._min_kern if kern_after else 0)
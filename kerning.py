@@ -0,0 +1,103 @@
+"""
+Optical kerning from glyph ink profiles.
+
+For every glyph the strokes are sampled in horizontal bands one font unit high,
+giving the leftmost and rightmost ink in each band (its ink profile). The visual gap
+between two glyphs set side by side is the smallest distance between the right
+profile of the first and the left profile of the second over the bands where both
+have ink (allowing a little vertical slack). Pairs whose gap is wider than the
+font's nominal spacing are tightened by the difference, e.g. "AV", "To" or "L'".
+
+This is expensive to do for every pair at layout time, so the table is computed
+once with this module and stored in the font (see Romans2._initialize_font).
+Running the module prints the table in that format:
+
+    python kerning.py > kern_table.txt
+"""
+import math
+
+
+def ink_profile(paths, band=1.0):
+    """
+    Returns {band index: (min x, max x)} of the ink of a glyph, with band i covering
+    y in [i * band, (i + 1) * band]. Every stroke segment contributes the x range it
+    spans inside each band it crosses.
+    """
+    profile = {}
+    for path in paths:
+        points = path if len(path) > 1 else path * 2
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            low, high = min(y0, y1), max(y0, y1)
+            for i in range(math.floor(low / band), math.floor(high / band) + 1):
+                if y0 == y1:
+                    xs = (x0, x1)
+                else:
+                    # Clip the segment to the band and keep the x values at both ends.
+                    t0 = (max(low, i * band) - y0) / (y1 - y0)
+                    t1 = (min(high, (i + 1) * band) - y0) / (y1 - y0)
+                    xs = (x0 + (x1 - x0) * t0, x0 + (x1 - x0) * t1)
+                left, right = profile.get(i, (math.inf, -math.inf))
+                profile[i] = (min(left, *xs), max(right, *xs))
+    return profile
+
+
+def pair_gap(advance, right_profile, left_profile, slack=2):
+    """
+    Smallest horizontal distance between the ink of a glyph (ending at `advance`)
+    and the ink of the next glyph, comparing each band with the bands up to `slack`
+    above and below it. Returns None if the glyphs have no ink at comparable heights.
+    """
+    gap = None
+    for i, (_, right) in right_profile.items():
+        for j in range(i - slack, i + slack + 1):
+            if j in left_profile:
+                distance = advance - right + left_profile[j][0]
+                if gap is None or distance < gap:
+                    gap = distance
+    return gap
+
+
+def compute_kerning(glyphs, advances, nominal_gap=4.0, max_tighten=5.0, step=0.5, min_kern=1.5, slack=2):
+    """
+    Derives kerning values from ink profiles.
+
+    `glyphs` maps a key to its stroke paths and `advances` maps the same key to its
+    advance width. Each pair whose optical gap is larger than `nominal_gap` is
+    tightened by the excess, capped at `max_tighten`, rounded to `step`, and kept
+    only if at least `min_kern`. Pairs are never loosened, and pairs without ink at
+    comparable heights are left alone. Returns {(a, b): kern}.
+    """
+    profiles = {key: ink_profile(paths) for key, paths in glyphs.items() if paths}
+    kerning = {}
+    for a, right_profile in profiles.items():
+        for b, left_profile in profiles.items():
+            gap = pair_gap(advances[a], right_profile, left_profile, slack)
+            if gap is None:
+                continue  # No ink at comparable heights, e.g. a quote followed by a period.
+            excess = min(gap - nominal_gap, max_tighten)
+            kern = round(excess / step) * step
+            if kern >= min_kern:
+                kerning[(a, b)] = -kern
+    return kerning
+
+
+def format_kerning(kerning):
+    """Formats a kerning table of 8-bit codes in the compact "AABB:k;..." form read by Romans2."""
+    return ";".join(f"{a:02X}{b:02X}:{k:g}" for (a, b), k in sorted(kerning.items()))
+
+
+def romans2_kerning():
+    """
+    Computes the kerning table of Romans2 from its unkerned glyphs. '1' is left out
+    as the first glyph of a pair: Romans2 gives it extra room on the right on purpose,
+    which the ink profiles would otherwise take away again.
+    """
+    from romans2_font import Romans2
+    font = Romans2()
+    glyphs = {c: font.t[c] for c in range(33, 127) if c in font.t}
+    kerning = compute_kerning(glyphs, font.l)
+    return {(a, b): kern for (a, b), kern in kerning.items() if a != ord('1')}
+
+
+if __name__ == "__main__":
+    print(format_kerning(romans2_kerning()))
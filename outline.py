@@ -0,0 +1,115 @@
+"""
+Stroke-to-outline expansion for the vector fonts.
+
+Turns the centre-line strokes returned by get_string() into filled shapely polygons
+at a given pen width, e.g. for laser marking or for checking that a label fits
+inside a part. Buffering strokes is expensive, so every glyph is expanded once per
+(glyph, pen width bucket) in font units and cached; a string is then composed from
+the cached glyph outlines by translation only, followed by one affine transform to
+the requested scale and position.
+
+    from romans_font import Romans
+    from outline import get_outliner
+
+    outliner = get_outliner(Romans())
+    parts = outliner.get_string_outline("123", pen_width=1.0, scale=0.5)
+"""
+import weakref
+
+import numpy as np
+import shapely
+
+from sized_font import SizedFont
+
+
+class StringOutliner:
+    """
+    Expands strings of one font into outlines. Pen widths are expressed in output
+    units and bucketed in font units to multiples of `width_step`, so labels of
+    slightly different sizes share their cached glyphs.
+    """
+
+    def __init__(self, font, width_step=0.25, quad_segs=4):
+        self.font = getattr(font, 'base_font', font)
+        self.unit = SizedFont(self.font, 1.0)
+        self.width_step = width_step
+        self.quad_segs = quad_segs
+        self._glyphs = {}    # (char, width bucket) -> outline in font units
+        self._advances = {}  # char -> advance in font units
+        self._kerning = {}   # (char, char) -> kerning in font units
+
+    def _bucket(self, width_units):
+        return max(round(width_units / self.width_step), 1) * self.width_step
+
+    def glyph_outline(self, char, width_units):
+        """Returns the cached outline of `char` at the bucketed pen width, in font units."""
+        key = (char, self._bucket(width_units))
+        outline = self._glyphs.get(key)
+        if outline is None:
+            strokes = [shapely.linestrings(path) if len(path) > 1 else shapely.points(path[0])
+                       for path in self.unit.get_string(char)]
+            if strokes:
+                outline = shapely.union_all(shapely.buffer(strokes, key[1] / 2, quad_segs=self.quad_segs))
+            else:
+                outline = shapely.Polygon()
+            self._glyphs[key] = outline
+        return outline
+
+    def _advance(self, char):
+        advance = self._advances.get(char)
+        if advance is None:
+            advance = self._advances[char] = self.unit.get_string_length(char)
+        return advance
+
+    def _kern(self, a, b):
+        kern = self._kerning.get((a, b))
+        if kern is None:
+            kern = self._kerning[(a, b)] = self.unit.get_string_length(a + b) - self._advance(a) - self._advance(b)
+        return kern
+
+    def get_string_outline(self, line, pen_width=1.0, scale=None, origin=(0.0, 0.0), merge=False):
+        """
+        Returns the outline of `line` drawn with a pen `pen_width` wide, laid out like
+        get_string() at `scale` (the font's scale by default) and moved to `origin`.
+        By default the result is an array with one geometry per inked glyph; with
+        merge=True the glyphs are unioned into a single geometry.
+        """
+        if scale is None:
+            scale = self.font.scale
+        width_units = pen_width / scale if scale else pen_width
+        parts = []
+        x = 0.0
+        prev = None
+        for char in line:
+            if prev is not None:
+                x += self._kern(prev, char)
+            outline = self.glyph_outline(char, width_units)
+            if not outline.is_empty:
+                parts.append(shapely.transform(outline, lambda coords, dx=x: coords + (dx, 0.0)))
+            x += self._advance(char)
+            prev = char
+
+        parts = np.array(parts, dtype=object)
+        if len(parts):
+            offset = np.asarray(origin, dtype=np.float64)
+            parts = shapely.transform(parts, lambda coords: coords * scale + offset)
+        if merge:
+            return shapely.union_all(parts) if len(parts) else shapely.Polygon()
+        return parts
+
+    def fits_inside(self, polygon, line, pen_width=1.0, scale=None, origin=(0.0, 0.0)):
+        """True if the outline of `line` lies completely inside `polygon`."""
+        parts = self.get_string_outline(line, pen_width, scale, origin)
+        return bool(shapely.contains(polygon, parts).all()) if len(parts) else True
+
+
+_outliners = weakref.WeakKeyDictionary()
+
+
+def get_outliner(font):
+    """Returns the shared StringOutliner of a font (or of the base font of a SizedFont view)."""
+    base_font = getattr(font, 'base_font', font)
+    outliner = _outliners.get(base_font)
+    if outliner is None:
+        outliner = _outliners[base_font] = StringOutliner(base_font)
+    return outliner
@@ -0,0 +1,169 @@
+"""
+A minimal streaming PDF writer for large vector jobs.
+
+Pages are built with PDFPage, which appends PDF path operators to a byte buffer
+with fixed-precision coordinates, and are then compressed and written to disk by
+PDFWriter one at a time. Only the object offsets are kept in memory, so the cost of
+a document grows with the size of its largest page, not with the number of pages.
+
+All pages share a single resource dictionary holding the ExtGState objects used for
+fill transparency. This module has no dependencies outside the standard library.
+"""
+import zlib
+from collections import namedtuple
+
+# A finished page: its size, its compressed content stream, the fill alphas it uses and
+# the number of decimals its numbers are written with.
+EncodedPage = namedtuple('EncodedPage', ['width', 'height', 'stream', 'alphas', 'precision'], defaults=(2,))
+
+
+def _alpha_name(alpha):
+    """Resource name of the ExtGState that sets the fill alpha, e.g. 0.6 -> GSa600."""
+    return f"GSa{round(alpha * 1000):03d}"
+
+
+class PDFPage:
+    """
+    Collects the drawing operators of one page. Colors are (r, g, b) tuples with
+    components in 0..1 and coordinates are in PDF points with the origin at the
+    bottom left corner, like reportlab's canvas.
+    """
+
+    def __init__(self, width, height, precision=2):
+        self.width = width
+        self.height = height
+        self._ops = []
+        self._alphas = set()
+        self.precision = precision
+        self._point = f"%.{precision}f %.{precision}f"
+        self._fill_rgb = None
+        self._stroke_rgb = None
+        self._fill_alpha = 1.0
+        self._line_width = 1.0
+
+    def translate(self, dx, dy):
+        self._ops.append(f"1 0 0 1 {self._point % (dx, dy)} cm")
+
+    def set_fill_rgb(self, rgb):
+        if rgb != self._fill_rgb:
+            self._fill_rgb = rgb
+            self._ops.append("%.4f %.4f %.4f rg" % tuple(rgb))
+
+    def set_stroke_rgb(self, rgb):
+        if rgb != self._stroke_rgb:
+            self._stroke_rgb = rgb
+            self._ops.append("%.4f %.4f %.4f RG" % tuple(rgb))
+
+    def set_fill_alpha(self, alpha):
+        if alpha != self._fill_alpha:
+            self._fill_alpha = alpha
+            self._alphas.add(alpha)
+            self._ops.append(f"/{_alpha_name(alpha)} gs")
+
+    def set_line_width(self, width):
+        if width != self._line_width:
+            self._line_width = width
+            self._ops.append(f"{width:.{self.precision}f} w")
+
+    def rect(self, x, y, width, height, fill=False, stroke=True):
+        self._ops.append(f"{self._point % (x, y)} {self._point % (width, height)} re {self._paint(fill, stroke)}")
+
+    def polygon(self, points, fill=True, stroke=True):
+        """Adds a closed polygon, filled and/or stroked with the current state."""
+        self._ops.append(self._path(points) + " h " + self._paint(fill, stroke))
+
+    def polyline(self, points):
+        """Adds an open stroked path."""
+        if len(points) > 1:
+            self._ops.append(self._path(points) + " S")
+
+    def _path(self, points):
+        point = self._point
+        ops = [point % tuple(points[0]) + " m"]
+        ops.extend(point % tuple(p) + " l" for p in points[1:])
+        return " ".join(ops)
+
+    @staticmethod
+    def _paint(fill, stroke):
+        if fill and stroke:
+            return "B"
+        if fill:
+            return "f"
+        return "S" if stroke else "n"
+
+    def encode(self, level=6):
+        """Compresses the page into an EncodedPage that can be cached or written."""
+        content = "\n".join(self._ops).encode('latin-1')
+        return EncodedPage(self.width, self.height, zlib.compress(content, level), frozenset(self._alphas), self.precision)
+
+
+class PDFWriter:
+    """
+    Writes EncodedPage objects to a PDF file as they are added.
+
+        with PDFWriter("out.pdf") as pdf:
+            page = PDFPage(200, 100)
+            page.polygon([(10, 10), (90, 10), (50, 80)])
+            pdf.add_page(page.encode())
+    """
+
+    # Object numbers reserved for the objects written when the document is closed.
+    _CATALOG, _PAGES, _RESOURCES = 1, 2, 3
+
+    def __init__(self, file_name):
+        self._file = open(file_name, 'wb')
+        self._offsets = {}
+        self._next_id = 4
+        self._page_ids = []
+        self._alphas = set()
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_object(self, obj_id, body):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode('latin-1'))
+        self._file.write(body)
+        self._file.write(b"\nendobj\n")
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_page(self, page):
+        """Writes the content stream and page object of an EncodedPage."""
+        self._alphas.update(page.alphas)
+        stream_id = self._allocate()
+        header = f"<< /Length {len(page.stream)} /Filter /FlateDecode >>\nstream\n".encode('latin-1')
+        self._write_object(stream_id, header + page.stream + b"\nendstream")
+
+        page_id = self._allocate()
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent {self._PAGES} 0 R "
+            f"/MediaBox [0 0 {page.width:.{page.precision}f} {page.height:.{page.precision}f}] "
+            f"/Resources {self._RESOURCES} 0 R /Contents {stream_id} 0 R >>"
+        ).encode('latin-1'))
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Writes the shared resources, the page tree, the cross-reference table and the trailer."""
+        if self._file.closed:
+            return
+        states = " ".join(f"/{_alpha_name(a)} << /Type /ExtGState /ca {a:.3f} >>" for a in sorted(self._alphas))
+        self._write_object(self._RESOURCES, f"<< /ExtGState << {states} >> >>".encode('latin-1'))
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode('latin-1'))
+        self._write_object(self._CATALOG, f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>".encode('latin-1'))
+
+        xref_offset = self._file.tell()
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, self._next_id):
+            lines.append(f"{self._offsets[obj_id]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {self._next_id} /Root {self._CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode('latin-1'))
+        self._file.close()
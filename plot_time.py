@@ -0,0 +1,221 @@
+"""
+Plot-time estimation for pen plotters.
+
+Estimates how long a plotter needs for a list of strokes, such as the paths
+returned by any font's get_string() or all the outlines and labels of a page. The
+pen is modelled like the motion planners of common plotter firmware (GRBL and
+friends): every move accelerates and decelerates at a constant rate up to a maximum
+speed, drawing slows down at corners according to a junction deviation, and between
+strokes the pen is lifted, travels in a straight line from standstill to standstill
+and is lowered again.
+
+The speed planning is vectorized with NumPy: with constant acceleration the usual
+forward and backward passes over the junctions reduce to running minima, so whole
+pages are estimated in milliseconds and different stroke orderings can be compared
+on every job.
+
+    from romans2_font import Romans2
+    from plot_time import PenModel, estimate_plot_time
+
+    font = Romans2()
+    font.scale = 0.5
+    estimate = estimate_plot_time(font.get_string("Part 12"), PenModel(draw_speed=40))
+    print(format_estimate(estimate))
+"""
+import argparse
+
+import numpy as np
+
+
+class PenModel:
+    """
+    Kinematic limits of a plotter, in drawing units (e.g. mm) and seconds.
+
+    draw_speed, draw_accel:     maximum speed and acceleration with the pen down.
+    travel_speed, travel_accel: maximum speed and acceleration with the pen up.
+    pen_down_time, pen_up_time: time to lower and to raise the pen.
+    junction_deviation:         how far the path may deviate from a corner; larger
+                                values let the pen take corners faster (0 stops at every corner).
+    """
+
+    def __init__(self, draw_speed=50.0, draw_accel=500.0, travel_speed=150.0, travel_accel=1000.0,
+                 pen_down_time=0.1, pen_up_time=0.1, junction_deviation=0.05):
+        self.draw_speed = draw_speed
+        self.draw_accel = draw_accel
+        self.travel_speed = travel_speed
+        self.travel_accel = travel_accel
+        self.pen_down_time = pen_down_time
+        self.pen_up_time = pen_up_time
+        self.junction_deviation = junction_deviation
+
+    def __repr__(self):
+        return (f"PenModel(draw_speed={self.draw_speed}, draw_accel={self.draw_accel}, "
+                f"travel_speed={self.travel_speed}, travel_accel={self.travel_accel}, "
+                f"pen_down_time={self.pen_down_time}, pen_up_time={self.pen_up_time}, "
+                f"junction_deviation={self.junction_deviation})")
+
+
+def move_times(lengths, v_entry, v_exit, max_speed, accel):
+    """
+    Times of straight moves with trapezoidal speed profiles: accelerate from
+    `v_entry`, cruise at `max_speed` if the move is long enough, decelerate to `v_exit`.
+    All arguments but the limits are arrays of the same length.
+    """
+    # Peak speed reached when the move is too short to cruise.
+    peak = np.sqrt(np.minimum(max_speed ** 2, (2 * accel * lengths + v_entry ** 2 + v_exit ** 2) / 2))
+    accelerating = (peak ** 2 - v_entry ** 2) / (2 * accel)
+    decelerating = (peak ** 2 - v_exit ** 2) / (2 * accel)
+    cruising = np.maximum(lengths - accelerating - decelerating, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cruise_time = np.where(peak > 0, cruising / peak, 0.0)
+    return (peak - v_entry) / accel + (peak - v_exit) / accel + cruise_time
+
+
+def plan_speeds(lengths, junction_limits, accel):
+    """
+    Highest speeds at the junctions of a chain of moves, given the squared speed
+    limit at every junction (len(lengths) + 1 values, 0 to stop) and a constant
+    acceleration. Equivalent to the forward and backward planner passes:
+    v[i]^2 <= v[j]^2 + 2 * accel * |s[i] - s[j]| for every pair of junctions.
+    """
+    s = np.concatenate(([0.0], np.cumsum(lengths)))
+    reach = 2 * accel * s
+    forward = reach + np.minimum.accumulate(junction_limits - reach)
+    backward = -reach + np.minimum.accumulate((junction_limits + reach)[::-1])[::-1]
+    return np.sqrt(np.maximum(np.minimum(forward, backward), 0.0))
+
+
+def estimate_plot_time(paths, model=None, start=(0.0, 0.0), return_to_start=False):
+    """
+    Estimates the time to plot `paths` (lists of (x, y) points, drawn in the given
+    order and direction) starting with the pen up at `start`.
+
+    Returns a dictionary with the total time in seconds and its breakdown into
+    'drawing', 'travel' and 'pen_lifts', the pen-down and pen-up distances, and the
+    number of strokes ('lifts'), drawn segments and corners that force the pen to slow down.
+    """
+    model = model or PenModel()
+    paths = [path for path in paths if len(path)]
+    counts = np.array([len(path) for path in paths], dtype=np.int64)
+    points = np.array([point for path in paths for point in path], dtype=np.float64).reshape(-1, 2)
+    ends = np.cumsum(counts)
+    estimate = {'total': 0.0, 'drawing': 0.0, 'travel': 0.0, 'pen_lifts': 0.0,
+                'draw_distance': 0.0, 'travel_distance': 0.0,
+                'lifts': len(paths), 'segments': 0, 'corners': 0}
+
+    # Pen-up travel from standstill to standstill: from the start position to the first point
+    # of every stroke and on from its last point (and optionally back to the start).
+    origins = np.vstack(([start], points[ends[:-1] - 1])) if len(paths) else np.empty((0, 2))
+    targets = points[ends - counts]
+    if return_to_start and len(paths):
+        origins = np.vstack((origins, points[-1:]))
+        targets = np.vstack((targets, [start]))
+    travel = np.hypot(*(targets - origins).T)
+    travel = travel[travel > 0]
+    zeros = np.zeros(len(travel))
+    estimate['travel'] = float(move_times(travel, zeros, zeros, model.travel_speed, model.travel_accel).sum())
+    estimate['travel_distance'] = float(travel.sum())
+    estimate['pen_lifts'] = len(paths) * (model.pen_down_time + model.pen_up_time)
+
+    if len(paths):
+        estimate.update(_drawing_time(points, counts, model))
+    estimate['total'] = estimate['drawing'] + estimate['travel'] + estimate['pen_lifts']
+    return estimate
+
+
+def _drawing_time(points, counts, model):
+    stroke_ids = np.repeat(np.arange(len(counts)), counts)
+
+    # Segments inside strokes, without zero-length ones (repeated points have no direction).
+    same_stroke = stroke_ids[1:] == stroke_ids[:-1]
+    vectors = (points[1:] - points[:-1])[same_stroke]
+    segment_stroke = stroke_ids[1:][same_stroke]
+    lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+    keep = lengths > 1e-12
+    vectors, segment_stroke, lengths = vectors[keep], segment_stroke[keep], lengths[keep]
+    if not len(lengths):
+        return {'drawing': 0.0, 'draw_distance': 0.0, 'segments': 0, 'corners': 0}
+
+    # Squared junction speed limits; the pen stops where strokes start and end.
+    max_squared = model.draw_speed ** 2
+    limits = np.zeros(len(lengths) + 1)
+    units = vectors / lengths[:, None]
+    interior = segment_stroke[1:] == segment_stroke[:-1]
+    cos_turn = np.clip((units[1:] * units[:-1]).sum(axis=1), -1.0, 1.0)
+    # Junction deviation: v^2 = a * d * sin(theta / 2) / (1 - sin(theta / 2)), theta being the angle
+    # between the two segments (pi when going straight on).
+    sin_half = np.sqrt((1.0 + cos_turn) / 2.0)
+    with np.errstate(divide='ignore'):
+        corner_squared = np.where(sin_half < 1.0 - 1e-9,
+                                  model.draw_accel * model.junction_deviation * sin_half / (1.0 - sin_half), np.inf)
+    limits[1:-1] = np.where(interior, np.minimum(corner_squared, max_squared), 0.0)
+
+    speeds = plan_speeds(lengths, limits, model.draw_accel)
+    times = move_times(lengths, speeds[:-1], speeds[1:], model.draw_speed, model.draw_accel)
+    return {'drawing': float(times.sum()), 'draw_distance': float(lengths.sum()),
+            'segments': int(len(lengths)), 'corners': int((interior & (corner_squared < max_squared)).sum())}
+
+
+def compare_orderings(orderings, model=None, start=(0.0, 0.0)):
+    """
+    Estimates several candidate orderings of the same strokes. Returns the index of
+    the fastest one and the list of estimates.
+    """
+    estimates = [estimate_plot_time(paths, model, start) for paths in orderings]
+    best = min(range(len(estimates)), key=lambda i: estimates[i]['total'])
+    return best, estimates
+
+
+def layout_paths(layout):
+    """
+    The strokes of a page laid out by visual_vector.layout_bin(): every piece
+    outline (closed) followed by its label.
+    """
+    paths = []
+    for piece in layout['pieces']:
+        outline = list(piece['vertices'])
+        paths.append(outline + outline[:1])
+        paths.extend(piece['label_paths'])
+    return paths
+
+
+def format_estimate(estimate):
+    """One-line human readable summary of an estimate."""
+    def clock(seconds):
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(int(minutes), 60)
+        return f"{hours}:{minutes:02d}:{seconds:04.1f}" if hours else f"{minutes}:{seconds:04.1f}"
+    return (f"{clock(estimate['total'])} total: drawing {clock(estimate['drawing'])} "
+            f"({estimate['draw_distance']:.0f} units, {estimate['corners']} corners), "
+            f"travel {clock(estimate['travel'])} ({estimate['travel_distance']:.0f} units), "
+            f"pen lifts {clock(estimate['pen_lifts'])} ({estimate['lifts']} strokes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimates the plotting time of a string.")
+    parser.add_argument("text")
+    parser.add_argument("--font", choices=["romans", "romans2", "hersheysans1"], default="romans2")
+    parser.add_argument("--scale", type=float, default=1.0, help="font scale (default: 1.0)")
+    parser.add_argument("--draw-speed", type=float, default=50.0)
+    parser.add_argument("--draw-accel", type=float, default=500.0)
+    parser.add_argument("--travel-speed", type=float, default=150.0)
+    parser.add_argument("--travel-accel", type=float, default=1000.0)
+    parser.add_argument("--pen-time", type=float, default=0.1, help="time to lower or raise the pen (default: 0.1)")
+    parser.add_argument("--junction-deviation", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.font == "romans":
+        from romans_font import Romans as font_class
+    elif args.font == "romans2":
+        from romans2_font import Romans2 as font_class
+    else:
+        from HersheySans1 import HersheySans1 as font_class
+    from sized_font import SizedFont
+    font = SizedFont(font_class(), args.scale)
+    model = PenModel(args.draw_speed, args.draw_accel, args.travel_speed, args.travel_accel,
+                     args.pen_time, args.pen_time, args.junction_deviation)
+    print(format_estimate(estimate_plot_time(font.get_string(args.text), model)))
+
+
+if __name__ == "__main__":
+    main()
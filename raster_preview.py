@@ -0,0 +1,226 @@
+"""
+Fast raster previews of nesting results.
+
+Renders the bin layouts computed by visual_vector.layout_bin() into small RGB
+images with NumPy: polygons are filled by scanline rasterization, outlines and
+Romans label strokes are drawn as sampled 1 pixel lines, and several bins can be
+tiled into a single contact sheet. Colors and alpha blending follow the PDF output.
+
+All pieces of a bin are filled in one vectorized pass and all its lines sampled in
+one call (outlines, then labels); labels smaller than a pixel are skipped. Rendering
+a bin costs about as much as encoding its page with the direct PDF writer and a
+fraction of drawing it with reportlab.
+"""
+import itertools
+import math
+
+import numpy as np
+
+from romans_font import Romans
+from sized_font import SizedFont
+
+WHITE = (1.0, 1.0, 1.0)
+LIGHTGREY = (0.827451, 0.827451, 0.827451)
+DARKGREY = (0.662745, 0.662745, 0.662745)
+BLACK = (0.0, 0.0, 0.0)
+
+# Height of the Romans digits in font units, to skip labels too small to see.
+LABEL_HEIGHT = 21.0
+
+
+def _to_pixels(points, scale, height, margin):
+    """Maps bin coordinates (y up) to pixel coordinates (y down)."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return pts[:, 0] * scale + margin, height - margin - pts[:, 1] * scale
+
+
+def fill_polygons(image, points, counts, colors, alphas):
+    """
+    Fills polygons given in pixel coordinates with the even-odd rule, blending each
+    polygon's color over the image with its alpha, in order. `points` holds the
+    (n, 2) vertices of all polygons one after the other and `counts` the number of
+    vertices of each; `colors` and `alphas` have one RGB triple and one alpha per
+    polygon. Pixel centres are sampled at (i + 0.5, j + 0.5). All scanlines of all
+    polygons are rasterized together.
+    """
+    height, width = image.shape[:2]
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(counts) or not len(points):
+        return
+    xs, ys = points[:, 0], points[:, 1]
+    firsts = np.cumsum(counts) - counts
+    # Edges run from every vertex to the next one of the same polygon.
+    following = np.arange(len(points)) + 1
+    following[firsts + counts - 1] = firsts
+
+    # Pixel rows whose centres each polygon can cover.
+    row_starts = np.maximum(np.ceil(np.minimum.reduceat(ys, firsts) - 0.5), 0).astype(np.int64)
+    row_ends = np.minimum(np.floor(np.maximum.reduceat(ys, firsts) - 0.5), height - 1).astype(np.int64)
+    row_counts = np.maximum(row_ends - row_starts + 1, 0)
+
+    # Every (row, edge) pair of every polygon; crossings are half-open in y so vertices count once.
+    pair_counts = row_counts * counts
+    polygon = np.repeat(np.arange(len(counts)), pair_counts)
+    index = np.arange(pair_counts.sum()) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    row_index = index // counts[polygon]
+    edge = firsts[polygon] + index % counts[polygon]
+    centres = row_starts[polygon] + row_index + 0.5
+    y0, y1 = ys[edge], ys[following[edge]]
+    crosses = (y0 <= centres) != (y1 <= centres)
+    polygon, row_index, edge, centres = polygon[crosses], row_index[crosses], edge[crosses], centres[crosses]
+    y0, y1 = y0[crosses], y1[crosses]
+    x0, x1 = xs[edge], xs[following[edge]]
+    x_at = x0 + (centres - y0) * (x1 - x0) / (y1 - y0)
+
+    # Sorted along each scanline (scanlines ordered by polygon), consecutive crossings are spans.
+    scanline = (np.cumsum(row_counts) - row_counts)[polygon] + row_index
+    order = np.lexsort((x_at, scanline))
+    left, right = order[0::2], order[1::2]
+    starts = np.clip(np.ceil(x_at[left] - 0.5), 0, width).astype(np.int64)
+    ends = np.clip(np.floor(x_at[right] - 0.5) + 1, 0, width).astype(np.int64)
+    lengths = np.maximum(ends - starts, 0)
+    span_polygon = polygon[left]
+    rows = row_starts[span_polygon] + row_index[left]
+
+    # Pixels of all spans, as flat indices into the rows the spans touch.
+    if not len(rows):
+        return
+    top, bottom = rows.min(), rows.max() + 1
+    pixel_polygon = np.repeat(span_polygon, lengths)
+    pixels = np.repeat((rows - top) * width + starts, lengths) + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # Each pass paints a map of which polygon covers which pixel and blends it over the
+    # rows as a whole: image * (1 - alpha) + color * alpha, with both terms looked up per
+    # polygon. The extra last entry is "no polygon", which leaves the pixel as it is.
+    # Covers of a pixel after the first are left for the next pass, so overlaps blend in order.
+    alphas = np.asarray(alphas, dtype=np.float64).reshape(-1)
+    premultiplied = np.vstack((np.asarray(colors, dtype=np.float64).reshape(-1, 3) * alphas[:, None], np.zeros(3)))
+    keep = np.append(1.0 - alphas, 1.0)
+    window = image[top:bottom]
+    remaining = np.arange(len(pixels))
+    while len(remaining):
+        if np.bincount(pixels[remaining]).max() > 1:
+            _, first = np.unique(pixels[remaining], return_index=True)
+        else:
+            first = slice(None)
+        owner = np.full(window.shape[0] * width, len(alphas))
+        owner[pixels[remaining[first]]] = pixel_polygon[remaining[first]]
+        owner = owner.reshape(window.shape[:2])
+        window *= np.take(keep, owner)[..., None]
+        window += np.take(premultiplied, owner, axis=0)
+        remaining = np.delete(remaining, first)
+
+
+def fill_polygon(image, xs, ys, rgb, alpha=1.0):
+    """Fills one polygon given in pixel coordinates, see fill_polygons()."""
+    fill_polygons(image, np.column_stack((xs, ys)), [len(xs)], [rgb], [alpha])
+
+
+def draw_polylines(image, points, counts, rgb):
+    """
+    Draws 1 pixel polylines in pixel coordinates by sampling every segment. `points`
+    holds the (n, 2) points of all polylines one after the other and `counts` the
+    number of points of each; all segments are sampled in one go.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(points) < 2:
+        return
+    height, width = image.shape[:2]
+    # Segments join consecutive points, except across the end of a polyline.
+    within = np.ones(len(points) - 1, dtype=bool)
+    within[np.cumsum(counts)[:-1] - 1] = False
+    origins = points[:-1][within]
+    deltas = (points[1:] - points[:-1])[within]
+    steps = np.maximum(np.ceil(np.hypot(deltas[:, 0], deltas[:, 1]) * 2), 1).astype(np.int64)
+    samples = steps + 1
+    segment = np.repeat(np.arange(len(steps)), samples)
+    # Sample i of a segment with n steps is at t = i / n.
+    index = np.arange(samples.sum()) - np.repeat(np.cumsum(samples) - samples, samples)
+    t = index / steps[segment]
+    px = np.floor(origins[segment, 0] + deltas[segment, 0] * t).astype(np.int64)
+    py = np.floor(origins[segment, 1] + deltas[segment, 1] * t).astype(np.int64)
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    image[py[inside], px[inside]] = rgb
+
+
+def draw_polyline(image, xs, ys, rgb, closed=False):
+    """Draws one 1 pixel polyline in pixel coordinates, see draw_polylines()."""
+    if closed:
+        xs, ys = np.append(xs, xs[0]), np.append(ys, ys[0])
+    draw_polylines(image, np.column_stack((xs, ys)), [len(xs)], rgb)
+
+
+def _paths_to_pixels(paths, scale, height, margin, closed=False):
+    """All points of several paths mapped to pixels as one (n, 2) array, and the point count of each."""
+    if closed:
+        paths = [list(path) + [path[0]] for path in paths]
+    counts = [len(path) for path in paths]
+    if not sum(counts):
+        return np.empty((0, 2)), counts
+    xs, ys = _to_pixels(list(itertools.chain.from_iterable(paths)), scale, height, margin)
+    return np.column_stack((xs, ys)), counts
+
+
+def render_bin_preview(bin_dimension, layout, scale=0.25, margin=4):
+    """
+    Renders one bin layout to a float RGB image (values in 0..1) at `scale` pixels
+    per bin unit. Piece colors are the reportlab colors chosen by layout_bin().
+    """
+    width = int(math.ceil(bin_dimension.width * scale)) + 2 * margin
+    height = int(math.ceil(bin_dimension.height * scale)) + 2 * margin
+    image = np.ones((height, width, 3), dtype=np.float64)
+
+    corners = [(0, 0), (bin_dimension.width, 0), (bin_dimension.width, bin_dimension.height), (0, bin_dimension.height)]
+    draw_polyline(image, *_to_pixels(corners, scale, height, margin), LIGHTGREY, closed=True)
+
+    pieces = layout['pieces']
+    outlines = [piece['vertices'] for piece in pieces]
+    fill_polygons(image, *_paths_to_pixels(outlines, scale, height, margin),
+                  [piece['color'].rgb() for piece in pieces], [piece['color'].alpha for piece in pieces])
+    # Outlines and labels go on top of all fills, each kind in a single call.
+    draw_polylines(image, *_paths_to_pixels(outlines, scale, height, margin, closed=True), DARKGREY)
+    labels = [path for piece in pieces if LABEL_HEIGHT * piece['label_scale'] * scale >= 1.0
+              for path in piece['label_paths']]
+    draw_polylines(image, *_paths_to_pixels(labels, scale, height, margin), BLACK)
+    return image
+
+
+def to_uint8(image):
+    """Converts a float RGB image (values in 0..1) to 8-bit RGB, a quarter of the memory of float64."""
+    return np.round(np.clip(image, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def make_contact_sheet(images, captions=None, columns=None, padding=8, caption_scale=0.6):
+    """
+    Tiles several preview images into one sheet, optionally writing a caption
+    (e.g. the bin number) above each tile with the Romans font. The sheet has the
+    dtype of the images: float RGB in 0..1, or uint8 as returned by to_uint8().
+    """
+    if not images:
+        raise ValueError("make_contact_sheet() needs at least one image")
+    columns = columns or int(math.ceil(math.sqrt(len(images))))
+    rows = int(math.ceil(len(images) / columns))
+    caption_height = int(math.ceil(32 * caption_scale)) if captions else 0
+    cell_w = max(image.shape[1] for image in images) + padding
+    cell_h = max(image.shape[0] for image in images) + padding + caption_height
+    dtype = images[0].dtype
+    white = 255 if dtype == np.uint8 else 1.0
+    sheet = np.full((rows * cell_h + padding, columns * cell_w + padding, 3), white, dtype=dtype)
+
+    font = SizedFont(Romans(), caption_scale)
+    for index, image in enumerate(images):
+        top = padding + (index // columns) * cell_h
+        left = padding + (index % columns) * cell_w
+        sheet[top + caption_height:top + caption_height + image.shape[0], left:left + image.shape[1]] = image
+        if captions:
+            baseline = top + 25 * caption_scale
+            for path in font.get_string(str(captions[index])):
+                pts = np.asarray(path)
+                draw_polyline(sheet, pts[:, 0] + left, baseline - pts[:, 1], tuple(c * white for c in BLACK))
+    return sheet
+
+
+def save_png(image, file_name):
+    """Saves a float or uint8 RGB image as a PNG file (requires Pillow)."""
+    from PIL import Image
+    Image.fromarray(image if image.dtype == np.uint8 else to_uint8(image), 'RGB').save(file_name)
@@ -0,0 +1,351 @@
+"""
+A long-running local render service that keeps fonts and caches warm.
+
+Starting a Python process per label or PDF job pays for importing and building the
+fonts (HersheySans1 in particular) and reportlab on every call. This service loads
+them once, on first use through the font registry (so any registered font name,
+including imported Hershey faces, can be requested), and answers newline-delimited JSON requests over a Unix socket or a
+localhost TCP port. Each request is one JSON object per line and gets one JSON line
+back carrying the same "id":
+
+    {"id": 1, "op": "layout", "font": "romans2", "text": "AV 12", "scale": 0.5}
+    {"id": 2, "op": "measure", "font": "romans", "strings": ["1", "22"], "scale": 1.0}
+    {"id": 3, "op": "render", "problem": "S266.txt", "bins_dir": "out", "output": "nest.pdf"}
+    {"id": 4, "op": "ping"}
+
+Layout and measure requests that arrive within a short window are batched: they are
+grouped by font and scale, identical texts are laid out once, and all widths of a
+group are measured with a single vectorized call. Identical render requests that are
+already running share one job, and a render to an output that a running job with other
+settings is writing is rejected. Work runs on a thread pool, which is safe because the
+fonts are only used through immutable SizedFont views.
+
+    python render_service.py serve --socket /tmp/romans.sock
+    python render_service.py bench --socket /tmp/romans.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from font_registry import get_registry
+from sized_font import SizedFont
+from string_metrics import measure_strings
+
+
+class RenderService:
+    """
+    Request handling for the service: warm fonts, a batching queue for layout and
+    measure requests, and de-duplication of concurrent render jobs.
+    """
+
+    def __init__(self, batch_window=0.002, max_batch=1024, workers=4, registry=None):
+        self.fonts = registry or get_registry()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = []         # (request, future) waiting for the next batch
+        self._batch_task = None
+        self._render_jobs = {}     # output path -> (render key, future of the running job)
+        self._problems = {}        # problem path -> (mtime_ns, bin_dimension, pieces)
+        self._problem_locks = {}   # problem path -> lock held while it is loaded
+        self._problem_locks_lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'batched_requests': 0}
+
+    async def handle(self, request):
+        """Answers one request dictionary and returns the response dictionary."""
+        self.stats['requests'] += 1
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True}
+        if op in ('layout', 'measure'):
+            self._check_text_request(request)
+            return await self._submit(request)
+        if op == 'render':
+            return await self._render(request)
+        if op == 'stats':
+            return dict(self.stats)
+        raise ValueError(f"unknown op {op!r}")
+
+    def _check_text_request(self, request):
+        """Rejects malformed layout/measure requests before they can join (and fail) a batch."""
+        if request.get('font', 'romans') not in self.fonts:
+            raise ValueError(f"unknown font {request.get('font')!r}; available: {', '.join(self.fonts.names())}")
+        scale = request.get('scale', 1.0)
+        if isinstance(scale, bool) or not isinstance(scale, (int, float)):
+            raise ValueError(f"'scale' must be a number, not {scale!r}")
+        if request['op'] == 'layout':
+            if not isinstance(request.get('text'), str):
+                raise ValueError("layout needs a 'text' string")
+        else:
+            strings = request.get('strings')
+            if not isinstance(strings, list) or not all(isinstance(text, str) for text in strings):
+                raise ValueError("measure needs a 'strings' list of strings")
+
+    # --- Batching of layout and measure requests ---
+
+    async def _submit(self, request):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._batch_task is None:
+            self._batch_task = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            self._batch_task = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.stats['batches'] += 1
+            self.stats['batched_requests'] += len(batch)
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self._compute_batch, [r for r, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _compute_batch(self, requests):
+        """
+        Computes a batch of layout/measure requests, sharing work between identical ones.
+        A request that fails gets its exception in place of a result; the others in the
+        batch are still answered.
+        """
+        groups = {}
+        for index, request in enumerate(requests):
+            key = (request.get('font', 'romans'), float(request.get('scale', 1.0)))
+            groups.setdefault(key, []).append(index)
+
+        results = [None] * len(requests)
+        for (font_name, scale), indices in groups.items():
+            try:
+                font = SizedFont(self.fonts.get(font_name), scale)
+                group = self._compute_group(font, [requests[index] for index in indices])
+            except Exception:
+                # Something in the group failed: answer its requests one by one to find the culprit.
+                group = []
+                for index in indices:
+                    try:
+                        group.extend(self._compute_group(SizedFont(self.fonts.get(font_name), scale), [requests[index]]))
+                    except Exception as e:
+                        group.append(e)
+            for index, result in zip(indices, group):
+                results[index] = result
+        return results
+
+    def _compute_group(self, font, requests):
+        """Results of layout/measure requests in one font and scale."""
+        texts = []
+        for request in requests:
+            texts.extend(request['strings'] if request['op'] == 'measure' else [request['text']])
+        unique = list(dict.fromkeys(texts))
+        widths = dict(zip(unique, measure_strings(font, unique).tolist()))
+        strokes = {}
+        results = []
+        for request in requests:
+            if request['op'] == 'measure':
+                results.append({'widths': [widths[text] for text in request['strings']]})
+            else:
+                text = request['text']
+                if text not in strokes:
+                    strokes[text] = font.get_string(text)
+                results.append({'width': widths[text], 'strokes': strokes[text]})
+        return results
+
+    # --- Render jobs ---
+
+    async def _render(self, request):
+        key = (os.path.abspath(request['problem']), os.path.abspath(request.get('bins_dir', '.')),
+               os.path.abspath(request['output']), request.get('backend', 'direct'), int(request.get('seed', 0)))
+        output = key[2]
+        running = self._render_jobs.get(output)
+        if running is not None and not running[1].done():
+            # Two jobs must never write one file; only an identical request can share it.
+            if running[0] != key:
+                raise ValueError(f"{request['output']!r} is already being rendered with other settings")
+            future = running[1]
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._render_job, key)
+            self._render_jobs[output] = (key, future)
+            future.add_done_callback(lambda done: self._forget_render_job(output, done))
+        return await asyncio.shield(future)
+
+    def _forget_render_job(self, output, future):
+        if self._render_jobs.get(output, (None, None))[1] is future:
+            del self._render_jobs[output]
+
+    def _load_problem(self, problem):
+        # Jobs on one problem wait for each other, so it is parsed (and its cache written) once.
+        import visual_vector
+        with self._problem_locks_lock:
+            lock = self._problem_locks.setdefault(problem, threading.Lock())
+        with lock:
+            mtime_ns = os.stat(problem).st_mtime_ns
+            cached = self._problems.get(problem)
+            if cached is None or cached[0] != mtime_ns:
+                cached = (mtime_ns,) + tuple(visual_vector.load_problem(problem))
+                self._problems[problem] = cached
+        return cached[1:]
+
+    def _render_job(self, key):
+        # Imported on first use so that layout-only services do not load reportlab and shapely.
+        import visual_vector
+        problem, bins_dir, output, backend, seed = key
+        bin_dimension, pieces = self._load_problem(problem)
+        bin_files = visual_vector.find_bin_files(bins_dir)
+        pages = visual_vector.create_packing_visual_pdf(visual_vector.iter_bins(bin_files), bin_dimension, pieces,
+                                                        file_name=output, seed=seed, backend=backend)
+        return {'output': output, 'pages': pages}
+
+    # --- Connections ---
+
+    async def serve_connection(self, reader, writer):
+        """Reads request lines and writes each response as soon as it is ready."""
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line):
+            request = {}
+            try:
+                request = json.loads(line)
+                response = await self.handle(request)
+            except Exception as e:
+                response = {'error': f"{type(e).__name__}: {e}"}
+            if isinstance(request, dict) and 'id' in request:
+                response['id'] = request['id']
+            async with lock:
+                writer.write(json.dumps(response, separators=(',', ':')).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+async def serve(socket_path=None, host='127.0.0.1', port=8765, **options):
+    """Runs the service on a Unix socket if `socket_path` is given, otherwise on host:port."""
+    service = RenderService(**options)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(service.serve_connection, path=socket_path, limit=2 ** 24)
+        print(f"Render service listening on {socket_path}")
+    else:
+        server = await asyncio.start_server(service.serve_connection, host=host, port=port, limit=2 ** 24)
+        print(f"Render service listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def _connect(socket_path=None, host='127.0.0.1', port=8765):
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    else:
+        sock = socket.create_connection((host, port))
+    return sock
+
+
+def request(payload, socket_path=None, host='127.0.0.1', port=8765):
+    """Sends one request to a running service and returns the decoded response."""
+    with _connect(socket_path, host, port) as sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(payload).encode() + b"\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def bench(socket_path=None, host='127.0.0.1', port=8765, count=2000, clients=16, cold_runs=5):
+    """
+    Compares a cold process per label (import, build the font, lay out one string)
+    with the warm service: single-request latency and throughput with concurrent clients.
+    """
+    cold_code = ("from romans2_font import Romans2; from HersheySans1 import HersheySans1; "
+                 "f = Romans2(); HersheySans1(); f.scale = 0.5; f.get_string('AV 123')")
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    for _ in range(cold_runs):
+        subprocess.run([sys.executable, '-c', cold_code], cwd=here, check=True)
+    cold = (time.perf_counter() - start) / cold_runs
+    print(f"cold process per request: {cold * 1000:.1f} ms")
+
+    payload = {'op': 'layout', 'font': 'romans2', 'text': 'AV 123', 'scale': 0.5}
+    request(payload, socket_path, host, port)  # Warm-up.
+    start = time.perf_counter()
+    for i in range(100):
+        request(dict(payload, id=i), socket_path, host, port)
+    latency = (time.perf_counter() - start) / 100
+    print(f"warm service latency:     {latency * 1000:.2f} ms ({cold / latency:.0f}x faster)")
+
+    async def run_clients():
+        async def client(n):
+            if socket_path:
+                reader, writer = await asyncio.open_unix_connection(socket_path, limit=2 ** 24)
+            else:
+                reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+            for i in range(n):
+                writer.write(json.dumps(dict(payload, id=i, text=f"Part {i % 500}")).encode() + b"\n")
+            await writer.drain()
+            for _ in range(n):
+                await reader.readline()
+            writer.close()
+        await asyncio.gather(*(client(count // clients) for _ in range(clients)))
+
+    start = time.perf_counter()
+    asyncio.run(run_clients())
+    elapsed = time.perf_counter() - start
+    print(f"warm service throughput:  {count / elapsed:.0f} requests/s with {clients} clients")
+    print(f"service stats: {request({'op': 'stats'}, socket_path, host, port)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm local render service for the vector fonts.")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--socket", help="Unix socket path (default: TCP on --host/--port)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-window", type=float, default=0.002,
+                        help="seconds to wait for more requests before computing a batch (default: 0.002)")
+    parser.add_argument("--workers", type=int, default=4, help="worker threads (default: 4)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.socket, args.host, args.port, batch_window=args.batch_window, workers=args.workers))
+        except KeyboardInterrupt:
+            print("\nRender service stopped.")
+    else:
+        bench(args.socket, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
-class Romans2:
+from kerned_font import KernedFont
+from viewport import ink_bounds
+
+
+class Romans2(KernedFont):
     def __init__(self):
         self.f = {}
         self.l = {}
         self.scale = 1.0
         self.t = {}
+        self.k = {}
+        self.b = {}
+        self.kerning = True
         self._initialize_font()
 
     def _initialize_font(self):
@@ -57,19 +64,13 @@ class Romans2:
                     shifted_paths.append(new_path)
                 
                 self.t[i] = shifted_paths
+        self.b, self.ink = ink_bounds(self.t) # Ink bounds, for clipping
 
-    def get_length(self, c): return self.l.get(c, 0) * self.scale
-    def get_string_length(self, line): return sum(self.get_length(ord(char)) for char in line)
-    def get_char(self, c): return self.t.get(c)
-    def get_string(self, line):
-        x = 0
-        out = []
-        for char in line:
-            c = ord(char)
-            ch = self.get_char(c)
-            if ch:
-                for path in ch:
-                    new_path = [(p[0] * self.scale + x, p[1] * self.scale) for p in path]
-                    out.append(new_path)
-            x += self.get_length(c)
-        return out
+        # Kerning pairs ("AABB:k", hex character codes) precomputed from the glyph ink profiles by kerning.py.
+        # '1' is never kerned against the following glyph: its wide right bearing is intended.
+        kerns = {}
+        kern_data = "2129:-2;212F:-3;215D:-5;216A:-5;2179:-2;2226:-5;222B:-5;222F:-5;2233:-2;2234:-3.5;223C:-5;2241:-4.5;224A:-5;225D:-5;2261:-2;2263:-2;2264:-2;2265:-2;2267:-2;226A:-4;226F:-2;2271:-2;227E:-3;2327:-1.5;232B:-4;232C:-5;232D:-4;232E:-5;232F:-5;2331:-1.5;2332:-3;233E:-2;233F:-2;2341:-2.5;235F:-5;2360:-2;236A:-5;2429:-3.5;242F:-4;245D:-5;245E:-3.5;245F:-2;2466:-3;246A:-4;2474:-3;2476:-2;2477:-1.5;2479:-3;252B:-2;252D:-2;252F:-4;255D:-5;255E:-5;2566:-3;256A:-4;2574:-3;2576:-2.5;2577:-1.5;2579:-3.5;2629:-4;262B:-3.5;262D:-3.5;262F:-3;2631:-4.5;2634:-2;2637:-4;263C:-2;2654:-5;2656:-2;2659:-4;265C:-3;265D:-5;266A:-5;2723:-5;2726:-5;2729:-2;272B:-5;272F:-5;2733:-2;2734:-5;2735:-1.5;273C:-5;2741:-5;274A:-5;275D:-5;275E:-2;2761:-4;2763:-4;2764:-4;2765:-4;2767:-4;276A:-4;276F:-4;2771:-4;2773:-2;2779:-1.5;2821:-2;2824:-3.5;2825:-3;2826:-5;2827:-2;2828:-4.5;282A:-3.5;282B:-5;282D:-5;282E:-4;2830:-5;2831:-3.5;2832:-4;2833:-3;2834:-5;2835:-3;2836:-5;2838:-4;2839:-4.5;283A:-4;283C:-5;283D:-5;283E:-3.5;283F:-3.5;2840:-5;2841:-4;2843:-5;2847:-5;284A:-5;284F:-5;2851:-5;2853:-3.5;285E:-5;285F:-2.5;2860:-3;2861:-5;2863:-5;2864:-5;2865:-5;2866:-5;2867:-3;286D:-4;286E:-4;286F:-5;2871:-5;2872:-4;2873:-5;2874:-4;2875:-5;2876:-5;2877:-5;2878:-4;287A:-4;287B:-1.5;287E:-5;2929:-4.5;292F:-4;2937:-2.5;2954:-2.5;2956:-2;2957:-1.5;2959:-2;295C:-2;295D:-4.5;295F:-1.5;296A:-4.5;2A26:-4;2A29:-3.5;2A2B:-5;2A2D:-5;2A2F:-5;2A33:-5;2A34:-2;2A37:-5;2A3C:-2;2A41:-4;2A4A:-5;2A54:-5;2A5A:-5;2A5D:-5;2A6A:-4;2B22:-5;2B23:-4;2B24:-4;2B25:-5;2B27:-5;2B29:-5;2B2A:-5;2B2C:-5;2B2E:-5;2B2F:-5;2B31:-4.5;2B32:-5;2B33:-5;2B35:-5;2B37:-5;2B3A:-5;2B3B:-5;2B3D:-5;2B3E:-5;2B3F:-5;2B41:-2.5;2B53:-4;2B54:-5;2B56:-3.5;2B57:-2;2B58:-4.5;2B59:-5;2B5A:-4.5;2B5C:-5;2B5D:-5;2B5E:-5;2B5F:-5;2B60:-5;2B66:-3;2B6A:-5;2B74:-3;2B78:-1.5;2B79:-2;2B7A:-5;2C23:-1.5;2C29:-2;2C2B:-5;2C2F:-1.5;2C31:-4.5;2C34:-5;2C37:-4;2C3C:-5;2C3F:-5;2C40:-2;2C43:-1.5;2C47:-1.5;2C4F:-1.5;2C51:-1.5;2C54:-5;2C56:-5;2C57:-4;2C59:-5;2C5C:-5;2C5D:-5;2C5E:-5;2C66:-3;2C6A:-4.5;2C74:-3;2C76:-4.5;2C77:-3;2C79:-4;2D23:-4;2D24:-4;2D25:-5;2D29:-5;2D2A:-5;2D2F:-5;2D31:-4.5;2D32:-5;2D33:-5;2D35:-5;2D37:-5;2D3E:-5;2D3F:-5;2D41:-2.5;2D53:-4;2D54:-5;2D56:-3.5;2D57:-2;2D58:-4.5;2D59:-5;2D5A:-4.5;2D5C:-5;2D5D:-5;2D5E:-5;2D66:-3;2D6A:-5;2D74:-3;2D78:-1.5;2D79:-2;2D7A:-5;2E23:-2;2E29:-4;2E2B:-5;2E2F:-3;2E31:-4.5;2E34:-5;2E37:-4;2E3C:-5;2E3F:-5;2E40:-2;2E43:-1.5;2E47:-1.5;2E4F:-1.5;2E51:-1.5;2E54:-5;2E56:-5;2E57:-4;2E59:-5;2E5C:-5;2E5D:-5;2E5E:-5;2E66:-3;2E6A:-5;2E74:-3;2E76:-4.5;2E77:-3;2E79:-5;2F21:-1.5;2F23:-5;2F24:-2;2F25:-2;2F26:-5;2F28:-4;2F2A:-2;2F2B:-5;2F2C:-5;2F2D:-5;2F2E:-5;2F2F:-5;2F30:-4;2F31:-2.5;2F32:-3.5;2F33:-2.5;2F34:-5;2F35:-2.5;2F36:-4;2F38:-3;2F39:-3;2F3A:-5;2F3B:-5;2F3C:-5;2F3D:-5;2F3E:-2;2F3F:-2.5;2F40:-5;2F41:-5;2F43:-4;2F47:-4;2F4A:-5;2F4F:-4;2F51:-4;2F53:-2;2F5E:-5;2F5F:-5;2F60:-2;2F61:-5;2F63:-5;2F64:-5;2F65:-5;2F66:-4.5;2F67:-5;2F6A:-4.5;2F6D:-4.5;2F6E:-4.5;2F6F:-5;2F70:-4.5;2F71:-5;2F72:-4.5;2F73:-5;2F74:-3.5;2F75:-4.5;2F76:-4.5;2F77:-4.5;2F78:-4.5;2F79:-5;2F7A:-4.5;2F7B:-1.5;2F7E:-5;3029:-5;302F:-5;3032:-1.5;3037:-2.5;3041:-1.5;3054:-2.5;3056:-1.5;3058:-1.5;3059:-1.5;305A:-1.5;305C:-1.5;305D:-5;305F:-3;306A:-5;3223:-2;3229:-4;322B:-2.5;322D:-2.5;322F:-3;3234:-4;3237:-2;323C:-2.5;3254:-2;3256:-1.5;3259:-1.5;325C:-1.5;325D:-5;326A:-5;3279:-2;327E:-2.5;3329:-2;332F:-5;333F:-1.5;335D:-5;335F:-3;3366:-2;336A:-5;3374:-2;3379:-2;3422:-5;3424:-5;3425:-4.5;3427:-5;3429:-5;342A:-5;342C:-5;342E:-5;342F:-5;3431:-4.5;3432:-5;3433:-5;3435:-5;3437:-5;3439:-2;343A:-5;343B:-5;343E:-5;343F:-5;3441:-2;3453:-5;3454:-5;3456:-4;3457:-2.5;3458:-3.5;3459:-5;345A:-3.5;345C:-5;345D:-5;345E:-5;345F:-5;3460:-5;3466:-3;346A:-5;3474:-3;3476:-1.5;3478:-3;3479:-2.5;347A:-4;3522:-2;3527:-2;3529:-3;352F:-5;3531:-4.5;3537:-2;353F:-3;3554:-2;3556:-2;3557:-2;3559:-2;355C:-2;355D:-5;355F:-3;3560:-2.5;3566:-2;356A:-5;3574:-2;3579:-2;3629:-4;362F:-5;3637:-1.5;3654:-1.5;365D:-5;365F:-3;3666:-3;366A:-5;3674:-3;3676:-1.5;3679:-2.5;3723:-4;3726:-5;3728:-2;372B:-4.5;372C:-5;372D:-4.5;372E:-5;372F:-5;3730:-1.5;3732:-1.5;3733:-2;3734:-5;3735:-1.5;3736:-1.5;373A:-2.5;373B:-2.5;373C:-4.5;373D:-3;3740:-2.5;3741:-5;3743:-2;3747:-2;374A:-5;374F:-2;3751:-2;375D:-5;375E:-3;375F:-5;3761:-4.5;3763:-4.5;3764:-4.5;3765:-4.5;3766:-2;3767:-4.5;376A:-4;376D:-2;376E:-2;376F:-4.5;3770:-2;3771:-4.5;3772:-2;3773:-3.5;3774:-2;3775:-2;3776:-2;3777:-2;3778:-2;3779:-3;377A:-2;377D:-1.5;377E:-4.5;3829:-4;382F:-4.5;3837:-1.5;3854:-1.5;385D:-5;385E:-1.5;385F:-2;386A:-5;3879:-2;3929:-4.5;392F:-5;3937:-2;3941:-1.5;3954:-2;395A:-1.5;395D:-5;395F:-3;396A:-5;3A29:-4;3A2B:-5;3A2F:-3;3A31:-4.5;3A34:-2;3A37:-4;3A3C:-2;3A54:-5;3A56:-2;3A59:-4;3A5C:-3;3A5D:-5;3A6A:-5;3B29:-2;3B2B:-5;3B2F:-1.5;3B31:-4.5;3B34:-2;3B37:-4;3B3C:-2;3B54:-5;3B56:-2;3B59:-4;3B5C:-3;3B5D:-5;3B6A:-4.5;3C23:-2;3C29:-3.5;3C2B:-5;3C2D:-5;3C2F:-3;3C34:-5;3C37:-4;3C3C:-5;3C3D:-5;3C54:-5;3C5D:-5;3C5E:-3;3C66:-2;3C6A:-4;3C74:-2;3C76:-2;3C77:-2;3C79:-3;3C7E:-5;3D29:-5;3D2B:-5;3D2F:-5;3D31:-4.5;3D32:-4;3D37:-5;3D3E:-5;3D3F:-5;3D41:-1.5;3D54:-5;3D56:-2.5;3D57:-1.5;3D58:-2.5;3D59:-5;3D5A:-2.5;3D5C:-3.5;3D5D:-5;3D6A:-5;3E22:-5;3E24:-4;3E25:-5;3E27:-5;3E29:-5;3E2A:-2;3E2C:-5;3E2E:-5;3E2F:-5;3E31:-4.5;3E32:-5;3E33:-3.5;3E35:-3;3E37:-5;3E3A:-2;3E3B:-2;3E3E:-5;3E3F:-5;3E41:-2.5;3E53:-4;3E54:-5;3E56:-3.5;3E57:-2;3E58:-4;3E59:-5;3E5A:-4;3E5C:-5;3E5D:-5;3E5E:-2;3E5F:-5;3E60:-5;3E66:-3;3E6A:-5;3E74:-3;3E78:-1.5;3E79:-2;3E7A:-4.5;3F26:-4;3F29:-3.5;3F2B:-2;3F2C:-5;3F2D:-2;3F2E:-5;3F2F:-5;3F33:-3;3F34:-3;3F3C:-2;3F41:-4.5;3F4A:-5;3F5D:-5;3F5F:-5;3F61:-1.5;3F63:-1.5;3F64:-1.5;3F65:-1.5;3F67:-1.5;3F6A:-4.5;3F6F:-1.5;3F71:-1.5;3F7E:-1.5;4029:-5;402C:-3;402E:-3;402F:-5;4032:-1.5;4037:-4;4041:-2.5;4054:-4;4056:-2;4057:-1.5;4058:-2.5;4059:-3;405A:-3;405C:-2.5;405D:-5;405F:-5;406A:-5;4122:-4.5;4123:-1.5;4127:-5;4129:-4;412A:-4;412B:-2.5;412D:-2.5;412F:-3;4130:-1.5;4131:-4.5;4134:-2;4137:-4;413C:-2.5;413D:-1.5;413F:-5;4140:-2;4143:-2;4147:-2;414F:-2;4151:-2;4154:-5;4156:-5;4157:-4.5;4159:-5;415C:-5;415D:-5;415E:-4;4160:-5;4166:-3;416A:-5;4174:-3.5;4176:-4;4177:-3;4179:-5;417E:-1.5;4229:-3.5;422F:-4.5;425D:-5;425F:-2;426A:-4.5;4329:-4.5;432B:-5;432D:-5;432F:-5;4337:-2;433C:-2;4354:-2;435D:-5;435E:-2;435F:-3;436A:-5;4429:-5;442C:-1.5;442E:-1.5;442F:-5;4432:-1.5;4437:-3;4441:-2;4454:-3;4456:-2;4458:-2;4459:-2;445A:-2;445C:-2;445D:-5;445F:-4;446A:-5;4523:-2;452A:-5;452B:-5;452D:-5;452F:-3;4530:-1.5;4531:-2.5;4534:-5;453C:-5;453D:-5;4540:-3;4543:-2;4547:-2;454F:-2;4551:-2;455D:-5;455E:-5;4566:-3;456A:-4;4574:-3;4576:-4.5;4577:-3;4579:-5;457E:-5;4623:-5;4626:-5;4628:-2.5;462A:-5;462B:-5;462C:-5;462D:-5;462E:-5;462F:-5;4630:-2.5;4631:-2.5;4632:-2;4633:-2;4634:-5;4635:-2;4636:-2.5;4638:-1.5;4639:-2;463A:-5;463B:-5;463C:-5;463D:-5;463E:-5;4640:-4;4641:-5;4643:-3;4647:-3;464A:-5;464F:-3;4651:-3;465D:-5;465E:-5;465F:-5;4661:-5;4663:-5;4664:-5;4665:-5;4666:-3.5;4667:-5;466A:-4;466D:-5;466E:-5;466F:-5;4670:-5;4671:-5;4672:-5;4673:-5;4674:-3;4675:-5;4676:-5;4677:-5;4678:-5;4679:-5;467A:-5;467D:-2;467E:-5;4729:-4.5;472F:-5;4737:-2;4754:-2;475D:-5;475E:-2;475F:-3;476A:-5;482F:-3;485D:-5;486A:-4;492F:-3;495D:-5;496A:-4;4A2F:-4.5;4A5D:-5;4A5F:-2;4A6A:-4;4B23:-2;4B2B:-5;4B2D:-5;4B2F:-3;4B30:-1.5;4B34:-4;4B3C:-4.5;4B3D:-3;4B40:-3;4B43:-2;4B47:-2;4B4F:-2;4B51:-2;4B5D:-5;4B5E:-5;4B66:-3;4B6A:-4;4B74:-3;4B76:-4;4B77:-3;4B79:-5;4B7E:-3;4C22:-5;4C23:-2;4C27:-5;4C29:-4;4C2A:-5;4C2B:-5;4C2D:-5;4C2F:-3;4C30:-1.5;4C31:-4.5;4C34:-5;4C37:-4;4C3C:-5;4C3D:-5;4C3F:-5;4C40:-3;4C43:-2;4C47:-2;4C4F:-2;4C51:-2;4C54:-5;4C56:-5;4C57:-4.5;4C59:-5;4C5C:-5;4C5D:-5;4C5E:-5;4C60:-5;4C66:-3;4C6A:-5;4C74:-3.5;4C76:-4.5;4C77:-3;4C79:-5;4C7E:-5;4D2F:-3;4D5D:-5;4D6A:-4;4E2F:-3;4E5D:-5;4E6A:-4;4F29:-5;4F2C:-1.5;4F2E:-1.5;4F2F:-5;4F32:-1.5;4F37:-3;4F41:-2;4F54:-3;4F56:-2;4F58:-2;4F59:-2;4F5A:-2;4F5C:-2;4F5D:-5;4F5F:-4;4F6A:-5;5026:-3;5029:-3.5;502C:-5;502E:-5;502F:-5;5033:-3;5034:-2.5;5041:-4;504A:-5;505D:-5;505F:-5;506A:-4.5;5129:-3.5;512F:-2.5;5137:-3;5154:-3;5156:-2;5159:-2;515C:-2;515D:-5;516A:-5;5229:-3.5;522B:-2;522D:-2;522F:-3;5234:-3;523C:-2;525D:-5;526A:-4.5;527E:-1.5;5329:-3.5;532F:-4;535D:-5;535E:-3.5;535F:-2;5366:-3;536A:-4;5374:-3;5376:-2;5377:-1.5;5379:-3;5423:-5;5426:-5;5428:-2.5;542A:-5;542B:-5;542C:-5;542D:-5;542E:-5;542F:-5;5430:-2.5;5431:-2.5;5432:-2;5433:-2;5434:-5;5435:-2;5436:-2.5;5438:-1.5;5439:-2;543A:-5;543B:-5;543C:-5;543D:-5;543E:-5;5440:-4;5441:-5;5443:-3;5447:-3;544A:-5;544F:-3;5451:-3;545D:-5;545E:-5;545F:-5;5461:-5;5463:-5;5464:-5;5465:-5;5466:-3.5;5467:-5;546A:-4;546D:-5;546E:-5;546F:-5;5470:-5;5471:-5;5472:-5;5473:-5;5474:-3;5475:-5;5476:-5;5477:-5;5478:-5;5479:-5;547A:-5;547D:-2;547E:-5;552F:-5;555D:-5;555F:-3;556A:-4;5623:-3.5;5626:-4.5;5628:-2;562B:-3.5;562C:-5;562D:-3.5;562E:-5;562F:-5;5630:-1.5;5632:-1.5;5633:-2;5634:-4;5635:-1.5;5636:-1.5;563A:-2;563B:-2;563C:-3.5;563D:-2.5;5640:-2;5641:-5;5643:-2;5647:-2;564A:-4;564F:-2;5651:-2;565D:-5;565E:-2.5;565F:-5;5661:-3.5;5663:-3.5;5664:-3.5;5665:-3.5;5666:-1.5;5667:-3.5;566A:-4;566D:-1.5;566E:-1.5;566F:-3.5;5670:-1.5;5671:-3.5;5672:-1.5;5673:-2.5;5674:-1.5;5675:-1.5;5676:-1.5;5677:-1.5;5678:-1.5;5679:-2.5;567A:-1.5;567E:-3.5;5723:-2.5;5726:-3;5728:-1.5;572B:-2;572C:-4;572D:-2;572E:-4;572F:-5;5733:-2;5734:-2.5;5735:-1.5;573C:-2;573D:-1.5;5740:-1.5;5741:-4.5;574A:-2.5;575D:-5;575E:-1.5;575F:-5;5761:-2.5;5763:-2.5;5764:-2.5;5765:-2.5;5767:-2.5;576A:-4;576F:-2.5;5771:-2.5;5773:-1.5;5779:-2;577E:-2.5;5823:-2;582B:-4.5;582D:-4.5;582F:-3;5830:-1.5;5834:-3.5;583C:-4;583D:-2.5;5840:-2.5;5843:-2;5847:-2;584F:-2;5851:-2;585D:-5;585E:-4;5866:-2.5;586A:-4;5874:-2.5;5876:-2.5;5877:-2.5;5879:-3.5;587E:-2.5;5923:-5;5926:-5;5928:-2;592B:-5;592C:-5;592D:-5;592E:-5;592F:-5;5930:-1.5;5932:-1.5;5933:-2;5934:-5;5935:-1.5;5936:-1.5;593A:-4;593B:-4;593C:-5;593D:-5;5940:-3;5941:-5;5943:-2;5947:-2;594A:-5;594F:-2;5951:-2;595D:-5;595E:-5;595F:-5;5961:-5;5963:-5;5964:-5;5965:-5;5966:-3;5967:-5;596A:-4;596D:-3;596E:-3;596F:-5;5970:-3;5971:-5;5972:-3;5973:-5;5974:-3;5975:-3;5976:-3;5977:-3;5978:-3;5979:-4;597A:-3;597D:-2;597E:-5;5A23:-2;5A2B:-5;5A2D:-5;5A2F:-3;5A30:-1.5;5A34:-5;5A3C:-5;5A3D:-4;5A40:-2.5;5A43:-2;5A47:-2;5A4F:-2;5A51:-2;5A5D:-5;5A5E:-4;5A66:-2.5;5A6A:-4;5A74:-2.5;5A76:-2.5;5A77:-2.5;5A79:-3.5;5A7E:-5;5B21:-5;5B22:-5;5B24:-5;5B25:-5;5B26:-5;5B27:-5;5B28:-4.5;5B2A:-5;5B2B:-5;5B2C:-5;5B2D:-5;5B2E:-5;5B30:-5;5B31:-5;5B32:-5;5B33:-5;5B34:-5;5B35:-5;5B36:-5;5B37:-5;5B38:-5;5B39:-5;5B3A:-5;5B3B:-5;5B3C:-5;5B3D:-5;5B3E:-5;5B3F:-5;5B40:-5;5B41:-5;5B42:-5;5B43:-5;5B44:-5;5B45:-5;5B46:-5;5B47:-5;5B48:-5;5B49:-5;5B4A:-5;5B4B:-5;5B4C:-5;5B4D:-5;5B4E:-5;5B4F:-5;5B50:-5;5B51:-5;5B52:-5;5B53:-5;5B54:-5;5B55:-5;5B56:-5;5B57:-5;5B58:-5;5B59:-5;5B5A:-5;5B5C:-5;5B5E:-5;5B5F:-5;5B60:-5;5B61:-5;5B62:-5;5B63:-5;5B64:-5;5B65:-5;5B66:-5;5B67:-3;5B68:-5;5B69:-5;5B6B:-5;5B6C:-5;5B6D:-5;5B6E:-5;5B6F:-5;5B71:-5;5B72:-5;5B73:-5;5B74:-5;5B75:-5;5B76:-5;5B77:-5;5B78:-5;5B7A:-5;5B7B:-1.5;5B7E:-5;5C22:-5;5C23:-1.5;5C24:-2;5C26:-2;5C27:-5;5C28:-2;5C29:-2;5C2A:-5;5C2B:-5;5C2D:-5;5C30:-3.5;5C31:-5;5C33:-2;5C34:-4.5;5C35:-2;5C36:-3;5C37:-4.5;5C38:-2;5C39:-2.5;5C3C:-5;5C3D:-4;5C3F:-5;5C40:-4.5;5C43:-4;5C47:-4;5C4A:-2;5C4F:-4;5C51:-4;5C53:-2;5C54:-5;5C55:-3;5C56:-5;5C57:-5;5C59:-5;5C5C:-5;5C5D:-5;5C5E:-5;5C60:-5;5C61:-3;5C63:-3;5C64:-3;5C65:-3;5C66:-3.5;5C67:-3;5C69:-1.5;5C6A:-4.5;5C6F:-3;5C71:-3;5C73:-1.5;5C74:-4.5;5C75:-1.5;5C76:-5;5C77:-4.5;5C79:-4;5C7D:-1.5;5C7E:-4;5E26:-4;5E29:-5;5E2B:-5;5E2C:-5;5E2D:-5;5E2E:-5;5E2F:-5;5E31:-2.5;5E32:-3;5E33:-5;5E34:-2;5E37:-5;5E38:-1.5;5E3C:-2;5E3E:-3;5E3F:-2;5E41:-4;5E4A:-5;5E54:-5;5E56:-2.5;5E57:-1.5;5E58:-4;5E59:-5;5E5A:-5;5E5C:-3.5;5E5D:-5;5E5F:-5;5E6A:-5;5E7B:-2;5F23:-1.5;5F24:-2;5F26:-2;5F28:-1.5;5F29:-2.5;5F2B:-5;5F2F:-1.5;5F30:-3;5F31:-4.5;5F33:-2;5F34:-5;5F35:-2;5F36:-3;5F37:-4;5F38:-2;5F39:-2;5F3C:-5;5F3F:-5;5F40:-5;5F43:-4;5F47:-4;5F4A:-2;5F4F:-4;5F51:-4;5F53:-2;5F54:-5;5F55:-3;5F56:-5;5F57:-5;5F59:-5;5F5C:-5;5F5D:-5;5F5E:-5;5F61:-3;5F63:-3;5F64:-3;5F65:-3;5F66:-3;5F67:-3;5F6A:-4.5;5F6F:-3;5F71:-3;5F74:-4;5F76:-5;5F77:-3.5;5F79:-5;6023:-5;6026:-5;602B:-5;602F:-5;6033:-2;6034:-4.5;603C:-5;6041:-5;604A:-5;605D:-5;6061:-3;6063:-3;6064:-3;6065:-3;6067:-3;606A:-4;606F:-3;6071:-3;6129:-4;612F:-3;6131:-4.5;6137:-4;6154:-5;6156:-1.5;6159:-3;615C:-2.5;615D:-5;616A:-5;6222:-2;6227:-3;6229:-5;622F:-5;6231:-4.5;6237:-5;623F:-5;6254:-5;6256:-3.5;6257:-2.5;6259:-5;625C:-5;625D:-5;625F:-3;6260:-3;6266:-2;626A:-5;6274:-2;6279:-2;6327:-2;6329:-5;632F:-4;6331:-4.5;6334:-1.5;6337:-4;633F:-4;6354:-5;6356:-2.5;6357:-1.5;6359:-5;635C:-4;635D:-5;635F:-2;6360:-2;636A:-5;642F:-3;645D:-5;646A:-4;6527:-2;6529:-5;652F:-4;6531:-4.5;6537:-4;653F:-4;6554:-5;6556:-3;6557:-2;6559:-5;655C:-4.5;655D:-5;655F:-2;6560:-2;656A:-5;6579:-1.5;6623:-2;6626:-5;662B:-5;662C:-5;662D:-5;662E:-5;662F:-5;6631:-2.5;6632:-2;6633:-2;6634:-4.5;6635:-2;6638:-1.5;663C:-5;663E:-2;6641:-5;664A:-5;665D:-5;665F:-5;6661:-3;6663:-3;6664:-3;6665:-3;6667:-3;666A:-4;666F:-3;6671:-3;6673:-1.5;6679:-2;667E:-4;6731:-4.5;6737:-4;6754:-5;6756:-1.5;6759:-3;675C:-2.5;6829:-4;682F:-3;6831:-4.5;6837:-4;683F:-3;6854:-5;6856:-3;6857:-2;6859:-5;685C:-4;685D:-5;686A:-5;6879:-1.5;692F:-4;6931:-1.5;695D:-5;696A:-4;6979:-2;6A2F:-1.5;6A31:-1.5;6A5D:-1.5;6A6A:-1.5;6A79:-1.5;6B23:-2;6B29:-4;6B2B:-3;6B2D:-3;6B2F:-3;6B31:-4.5;6B34:-4;6B37:-4;6B3C:-3;6B54:-5;6B56:-2.5;6B57:-2;6B59:-4;6B5C:-3.5;6B5D:-5;6B6A:-5;6B79:-2;6B7E:-2;6C2F:-3;6C5D:-5;6C6A:-4;6D29:-4;6D2F:-3;6D31:-4.5;6D37:-4;6D3F:-3;6D54:-5;6D56:-3;6D57:-2;6D59:-5;6D5C:-4;6D5D:-5;6D6A:-5;6D79:-1.5;6E29:-4;6E2F:-3;6E31:-4.5;6E37:-4;6E3F:-3;6E54:-5;6E56:-3;6E57:-2;6E59:-5;6E5C:-4;6E5D:-5;6E6A:-5;6E79:-1.5;6F22:-2;6F27:-3;6F29:-5;6F2F:-5;6F31:-4.5;6F37:-5;6F3F:-5;6F54:-5;6F56:-3.5;6F57:-2.5;6F59:-5;6F5C:-5;6F5D:-5;6F5F:-3;6F60:-3;6F66:-2;6F6A:-5;6F74:-2;6F79:-2;7022:-2;7027:-3;7029:-5;702F:-5;7031:-4.5;7037:-5;703F:-5;7054:-5;7056:-3.5;7057:-2.5;7059:-5;705C:-5;705D:-5;705F:-3;7060:-3;7066:-2;706A:-5;7074:-2;7079:-2;7131:-4.5;7137:-4;7154:-5;7156:-1.5;7159:-3;715C:-2.5;7226:-5;7229:-5;722B:-5;722C:-5;722D:-5;722E:-5;722F:-5;7231:-4.5;7233:-5;7234:-3.5;7237:-5;723C:-5;723E:-2;7241:-4.5;724A:-5;7254:-5;7256:-1.5;7258:-2.5;7259:-3;725A:-5;725C:-2.5;725D:-5;725F:-5;7261:-2;7263:-2;7264:-2;7265:-2;7267:-2;726A:-5;726F:-2;7271:-2;727B:-2;727E:-3;7329:-5;732F:-4;7331:-4.5;7337:-4;733F:-4;7354:-5;7356:-2.5;7357:-1.5;7359:-5;735C:-4;735D:-5;736A:-5;7423:-2;7429:-4;742B:-5;742D:-5;742F:-3;7431:-4.5;7434:-4.5;7437:-4;743C:-5;7454:-5;7456:-2.5;7457:-2;7459:-4;745C:-3.5;745D:-5;746A:-5;7479:-2;747E:-4;7529:-4;752F:-3;7531:-4.5;7537:-4;7554:-5;7556:-1.5;7559:-3;755C:-2.5;755D:-5;756A:-5;7626:-2;7629:-5;762C:-4.5;762E:-4.5;762F:-5;7631:-4.5;7633:-3;7634:-1.5;7637:-5;763E:-2;7641:-4;764A:-1.5;7654:-5;7656:-1.5;7658:-2.5;7659:-3;765A:-4.5;765C:-2.5;765D:-5;765F:-5;766A:-5;7726:-1.5;7729:-5;772C:-3;772E:-3;772F:-5;7731:-4.5;7733:-2;7737:-5;773E:-2;7741:-3;7754:-5;7756:-1.5;7758:-2.5;7759:-3;775A:-3;775C:-2.5;775D:-5;775F:-3.5;776A:-5;7829:-4;782B:-1.5;782D:-1.5;782F:-3;7831:-4.5;7834:-3;7837:-4;783C:-1.5;7854:-5;7856:-1.5;7859:-3;785C:-2.5;785D:-5;786A:-5;7926:-2;7929:-5;792C:-4.5;792E:-4.5;792F:-5;7931:-4.5;7933:-3;7934:-1.5;7937:-5;793E:-2;7941:-4;794A:-1.5;7954:-5;7956:-1.5;7958:-2.5;7959:-3;795A:-4.5;795C:-2.5;795D:-5;795F:-5;796A:-5;7A29:-4;7A2B:-1.5;7A2D:-1.5;7A2F:-3;7A31:-4.5;7A34:-3;7A37:-4;7A3C:-1.5;7A54:-5;7A56:-1.5;7A59:-3;7A5C:-2.5;7A5D:-5;7A6A:-5;7B37:-2;7B54:-2;7B59:-2;7B5C:-1.5;7D29:-1.5;7D2F:-1.5;7D33:-2;7D35:-2;7D5D:-1.5;7D5E:-2;7D66:-2;7D6A:-1.5;7D74:-2;7D79:-1.5;7E29:-5;7E2F:-5;7E31:-4.5;7E32:-5;7E37:-5;7E3E:-5;7E3F:-5;7E41:-2.5;7E54:-5;7E56:-2.5;7E57:-1.5;7E58:-3.5;7E59:-5;7E5A:-3.5;7E5C:-3.5;7E5D:-5;7E6A:-5"
+        for entry in kern_data.split(';'):
+            pair, value = entry.split(':')
+            kerns[(int(pair[:2], 16), int(pair[2:], 16))] = float(value)
+        self.k = kerns
@@ -1,9 +1,13 @@
+from viewport import clip_string, ink_bounds
+
+
 class Romans:
     def __init__(self):
         self.f = {}
         self.l = {}
         self.scale = 1.0
         self.t = {}
+        self.b = {}
         self._initialize_font()
 
     def _initialize_font(self):
@@ -27,11 +31,13 @@ class Romans:
                             path.append((x, y))
                     if path: paths.append(path)
                 self.t[i] = paths
+        self.b, self.ink = ink_bounds(self.t) # Ink bounds, for clipping
 
     def get_length(self, c): return self.l.get(c, 0) * self.scale
     def get_string_length(self, line): return sum(self.get_length(ord(char)) for char in line)
     def get_char(self, c): return self.t.get(c)
-    def get_string(self, line):
+    def get_string(self, line, clip=None):
+        if clip is not None: return self.get_clipped_string(line, clip)
         x = 0
         out = []
         for char in line:
@@ -42,4 +48,7 @@ class Romans:
                     new_path = [(p[0] * self.scale + x, p[1] * self.scale) for p in path]
                     out.append(new_path)
             x += self.get_length(c)
-        return out
\ No newline at end of file
+        return out
+    def get_clipped_string(self, line, clip):
+        # clip = (min_x, min_y, max_x, max_y) in get_string() coordinates, see viewport.clip_string().
+        return clip_string(map(ord, line), clip, self.scale, lambda c: self.l.get(c, 0), self.t.get, self.b, self.ink)
\ No newline at end of file
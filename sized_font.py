@@ -0,0 +1,63 @@
+"""
+Immutable sized views of the vector fonts.
+
+The font classes keep their size in a mutable `scale` attribute, so a font object
+that is resized between calls cannot be shared between threads. A SizedFont wraps
+one shared font object and carries its own scale: every method of the font class
+(get_string, get_string_length, get_length, get_char, measure, ...) runs against
+the view, reading the glyph data from the shared font and the scale from the view.
+Views cannot be modified, so any number of threads can use them without locks.
+
+    from concurrent.futures import ThreadPoolExecutor
+    from romans_font import Romans
+    from sized_font import SizedFont
+
+    font = Romans()
+    jobs = [("12", 0.5), ("345", 1.5)]
+    with ThreadPoolExecutor() as pool:
+        paths = list(pool.map(lambda job: SizedFont(font, job[1]).get_string(job[0]), jobs))
+"""
+import inspect
+import types
+
+
+class SizedFont:
+    """A read-only view of `font` at a fixed `scale`."""
+
+    __slots__ = ('base_font', 'scale', '_methods')
+
+    def __init__(self, font, scale):
+        if isinstance(font, SizedFont):
+            font = font.base_font
+        object.__setattr__(self, 'base_font', font)
+        object.__setattr__(self, 'scale', float(scale))
+        object.__setattr__(self, '_methods', {})
+
+    def __getattr__(self, name):
+        # Only called for names that are not slots: font methods and glyph data.
+        if name.startswith('__'):
+            raise AttributeError(name)
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+        font = self.base_font
+        attribute = inspect.getattr_static(type(font), name, None)
+        if isinstance(attribute, types.FunctionType):
+            # Plain methods are bound to the view, so `self.scale` inside them is ours.
+            method = types.MethodType(attribute, self)
+            self._methods[name] = method
+            return method
+        return getattr(font, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SizedFont is immutable; use with_scale() to get a view with another scale")
+
+    def __delattr__(self, name):
+        raise AttributeError("SizedFont is immutable")
+
+    def with_scale(self, scale):
+        """Returns a view of the same font at another scale."""
+        return SizedFont(self.base_font, scale)
+
+    def __repr__(self):
+        return f"SizedFont({type(self.base_font).__name__}, scale={self.scale:g})"
@@ -0,0 +1,110 @@
+"""
+Vectorized string measurement for the vector fonts.
+
+StringMeasurer measures many strings in one call and returns their widths as a NumPy
+array, in the same units as the font's get_string_length(). Advances are looked up in
+a dense table indexed by codepoint, with a dictionary fallback for codepoints beyond
+it, and the font's kerning pairs are applied with a sorted-key binary search, so no
+Python code runs per character.
+
+    from romans_font import Romans
+    from string_metrics import measure_strings
+
+    widths = measure_strings(Romans(), ["1", "22", "333"])
+"""
+import weakref
+
+import numpy as np
+
+# Codepoints below this limit get a slot in the dense advance table.
+DENSE_LIMIT = 0x10000
+
+
+def _pair_key(first, second):
+    return (int(first) << 21) | int(second)
+
+
+class StringMeasurer:
+    """
+    Batch measurement for one font. Supports the Romans-style fonts (advances in
+    `font.l` keyed by ordinal, multiplied by `font.scale`) and the HersheySans1-style
+    fonts (advances in `font._glyphs` keyed by character, unscaled like their
+    get_string_length()). Kerning pairs are taken from `font.k` (Romans2) or
+    `font._kern` (HersheySans1) when present, and skipped while `font.kerning` is False.
+    The tables are built once; create a new measurer if the font data changes.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.scaled = not hasattr(font, '_glyphs')
+        if self.scaled:
+            advances = {c: float(w) for c, w in font.l.items()}
+            self.default = float(getattr(font, 'default_advance', 0.0))
+            kerning = dict(getattr(font, 'k', {}))
+        else:
+            advances = {ord(ch): float(glyph[0]) for ch, glyph in font._glyphs.items()}
+            self.default = float(font._default_adv)
+            kerning = {(ord(a), ord(b)): float(k) for (a, b), k in font._kern.items()}
+
+        size = min(max(advances, default=0) + 1, DENSE_LIMIT)
+        self.advances = np.full(size, self.default, dtype=np.float64)
+        for c, w in advances.items():
+            if c < size:
+                self.advances[c] = w
+        self.fallback = {c: w for c, w in advances.items() if c >= size}
+
+        keys = sorted(kerning, key=lambda pair: _pair_key(*pair))
+        self.kern_keys = np.array([_pair_key(*pair) for pair in keys], dtype=np.uint64)
+        self.kern_values = np.array([kerning[pair] for pair in keys], dtype=np.float64)
+
+    def measure(self, strings, scale=None):
+        """
+        Returns the widths of `strings` as a float64 array. For Romans-style fonts the
+        widths are multiplied by `scale`, or by the font's current scale if omitted;
+        HersheySans1-style widths are in font units and only scaled if `scale` is given.
+        """
+        strings = list(strings)
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        codes = np.frombuffer(''.join(strings).encode('utf-32-le'), dtype=np.uint32)
+
+        size = len(self.advances)
+        advances = self.advances[np.minimum(codes, size - 1)]
+        outside = np.flatnonzero(codes >= size)
+        if len(outside):
+            advances[outside] = [self.fallback.get(int(c), self.default) for c in codes[outside]]
+
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        if len(self.kern_keys) and len(codes) > 1 and getattr(self.font, 'kerning', True):
+            pairs = (codes[:-1].astype(np.uint64) << np.uint64(21)) | codes[1:].astype(np.uint64)
+            slots = np.minimum(np.searchsorted(self.kern_keys, pairs), len(self.kern_keys) - 1)
+            kerns = np.where(self.kern_keys[slots] == pairs, self.kern_values[slots], 0.0)
+            # A pair that straddles two strings must not count: its second code starts a string.
+            first_codes = starts[(lengths > 0) & (starts > 0)]
+            kerns[first_codes - 1] = 0.0
+            advances[1:] += kerns
+
+        totals = np.concatenate(([0.0], np.cumsum(advances)))
+        widths = totals[ends] - totals[starts]
+        if scale is None:
+            scale = self.font.scale if self.scaled else 1.0
+        return widths * scale
+
+
+_measurers = weakref.WeakKeyDictionary()
+
+
+def measure_strings(font, strings, scale=None):
+    """
+    Measures many strings with `font` at once (see StringMeasurer.measure). The
+    measurer for each font object is built on first use and reused afterwards;
+    sized_font.SizedFont views share the measurer of their base font and are
+    measured at the view's scale.
+    """
+    base_font = getattr(font, 'base_font', font)
+    measurer = _measurers.get(base_font)
+    if measurer is None:
+        measurer = _measurers[base_font] = StringMeasurer(base_font)
+    if scale is None:
+        scale = font.scale if measurer.scaled else 1.0
+    return measurer.measure(strings, scale=scale)
@@ -0,0 +1,98 @@
+"""
+Checks the selection of a subset of bins in visual_vector.py: parsing of --bins
+selections, picking the Bin-*.txt files of the selected bins, and parsing only the
+problem pieces those bins place.
+
+Run with: python -m unittest test_bin_selection (or pytest).
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from visual_vector import find_bin_files, parse_bin_selection, parse_problem_file
+
+PROBLEM = """1000 800
+3
+0.00,0.00 42.09,0.00 21.05,106.27
+0.00,0.00 98.74,0.00 98.74,52.96 0.00,52.96
+
+10.5,-3.25 60.00,0.00 55.5,40.125 12.00,38.00
+"""
+
+
+class ParseBinSelectionTest(unittest.TestCase):
+
+    def test_numbers_and_ranges(self):
+        self.assertEqual(parse_bin_selection("3,5,10-12"), {3, 5, 10, 11, 12})
+        self.assertEqual(parse_bin_selection("7"), {7})
+        self.assertEqual(parse_bin_selection("4-4"), {4})
+
+    def test_spaces_overlaps_and_empty_parts(self):
+        self.assertEqual(parse_bin_selection(" 1 , 2-3,,3-4, "), {1, 2, 3, 4})
+
+    def test_malformed_selections_are_rejected(self):
+        for text in ("a", "1,x", "2-", "-3", "1-2-3", "3.5"):
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, "invalid bin selection"):
+                    parse_bin_selection(text)
+
+    def test_invalid_ranges_are_rejected(self):
+        for text in ("0", "5-3", "0-2"):
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, "invalid bin range"):
+                    parse_bin_selection(text)
+
+    def test_empty_selection_is_rejected(self):
+        for text in ("", " ", ",,"):
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, "empty bin selection"):
+                    parse_bin_selection(text)
+
+
+class BinSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('Bin-1.txt', 'Bin-2.txt', 'Bin-10.txt', 'Bin-3.txt', 'Bin-x.txt', 'notes.txt'):
+            with open(os.path.join(self.directory, name), 'w') as f:
+                f.write("0\n")
+        self.path = os.path.join(self.directory, 'prob.txt')
+        self.write_problem(PROBLEM)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_problem(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def bin_names(self, bins=None):
+        return [os.path.basename(path) for path in find_bin_files(self.directory, bins=bins)]
+
+    def test_all_bin_files_in_numeric_order(self):
+        self.assertEqual(self.bin_names(), ['Bin-1.txt', 'Bin-2.txt', 'Bin-3.txt', 'Bin-10.txt'])
+
+    def test_selected_bin_files(self):
+        self.assertEqual(self.bin_names(parse_bin_selection("10,2-3")), ['Bin-2.txt', 'Bin-3.txt', 'Bin-10.txt'])
+        # Selected bins without a file are not an error; they are just not found.
+        self.assertEqual(self.bin_names({1, 4, 99}), ['Bin-1.txt'])
+        self.assertEqual(self.bin_names(set()), [])
+
+    def test_selected_pieces_match_full_parse(self):
+        full = parse_problem_file(self.path)[1]
+        selected = parse_problem_file(self.path, piece_ids={2, 3})[1]
+        self.assertEqual(sorted(selected), [2, 3])
+        for piece_id in selected:
+            self.assertEqual(selected[piece_id], full[piece_id])
+
+    def test_selection_skips_lines_without_vertices(self):
+        # A line with a comma but no coordinate pair is not a piece, skipped or not.
+        self.write_problem(PROBLEM.replace('\n3\n', '\n3\nnote, no piece here\n'))
+        full = parse_problem_file(self.path)[1]
+        self.assertEqual(sorted(full), [1, 2, 3])
+        self.assertEqual(parse_problem_file(self.path, piece_ids={3})[1][3], full[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
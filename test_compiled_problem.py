@@ -0,0 +1,86 @@
+"""
+Checks the compiled .npz cache of problem files used by visual_vector.py:
+loading through the cache gives the same pieces as parsing the text, and an
+edited problem file is parsed again instead of being served from a stale cache.
+
+Run with: python -m unittest test_compiled_problem (or pytest).
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from visual_vector import (CompiledPieces, compiled_problem_path, load_problem,
+                           parse_problem_file, write_compiled_problem)
+
+PROBLEM = """1000 800
+3
+0.00,0.00 42.09,0.00 21.05,106.27
+0.00,0.00 98.74,0.00 98.74,52.96 0.00,52.96
+
+10.5,-3.25 60.00,0.00 55.5,40.125 12.00,38.00
+"""
+
+
+class CompiledProblemTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'prob.txt')
+        self.write_problem(PROBLEM)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_problem(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def assert_same_pieces(self, loaded, parsed):
+        self.assertEqual(loaded[0], parsed[0])
+        self.assertEqual(sorted(loaded[1]), sorted(parsed[1]))
+        for piece_id, (vertices, pivot) in parsed[1].items():
+            loaded_vertices, loaded_pivot = loaded[1][piece_id]
+            np.testing.assert_array_equal(np.asarray(loaded_vertices), np.asarray(vertices))
+            self.assertEqual(loaded_pivot, pivot)
+
+    def test_round_trip(self):
+        parsed = parse_problem_file(self.path)
+        # The first load parses the text and writes the cache, the second one memory-maps it.
+        self.assert_same_pieces(load_problem(self.path), parsed)
+        self.assertTrue(os.path.exists(compiled_problem_path(self.path)))
+        cached = load_problem(self.path)
+        self.assertIsInstance(cached[1], CompiledPieces)
+        self.assert_same_pieces(cached, parsed)
+
+    def test_concurrent_writers_publish_complete_files(self):
+        parsed = parse_problem_file(self.path)
+        with open(self.path, 'rb') as f:
+            source_hash = hashlib.sha256(f.read()).digest()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: write_compiled_problem(self.path, source_hash, *parsed), range(16)))
+        # No temporary file is left behind, and the published cache is a whole one.
+        self.assertEqual(sorted(os.listdir(self.directory)), ['prob.txt', os.path.basename(compiled_problem_path(self.path))])
+        cached = load_problem(self.path)
+        self.assertIsInstance(cached[1], CompiledPieces)
+        self.assert_same_pieces(cached, parsed)
+
+    def test_changed_source_invalidates_cache(self):
+        load_problem(self.path)
+        # Same length and line count as before, so only the contents tell the versions apart.
+        changed = PROBLEM.replace('42.09', '43.09').replace('1000 800', '1200 800')
+        self.write_problem(changed)
+        loaded = load_problem(self.path)
+        self.assertEqual(loaded[0].width, 1200.0)
+        self.assert_same_pieces(loaded, parse_problem_file(self.path))
+        # The rewritten cache holds the new version.
+        self.assertIsInstance(load_problem(self.path)[1], CompiledPieces)
+        self.assert_same_pieces(load_problem(self.path), parse_problem_file(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+"""
+Retained, incrementally updated layout of wrapped text.
+
+A TextBlock keeps a document as paragraphs (separated by newlines), each with its
+line breaks, line widths and, once drawn, its stroke buffers. Lines are broken
+greedily at spaces like wrap_and_draw() in test_romans.py. An edit lays out only
+the paragraphs it touches; the positions of the following lines are prefix sums
+that are brought up to date lazily, so typing in a long document costs about as
+much as laying out the edited paragraph.
+
+    from romans2_font import Romans2
+    from sized_font import SizedFont
+    from text_block import TextBlock
+
+    block = TextBlock(SizedFont(Romans2(), 0.8), max_width=500, line_height=28.8, text=document)
+    block.insert(120, "new words ")
+    paths = block.get_strokes(clip=(0, -600, 500, 0))   # only the visible lines
+
+Coordinates follow get_string(): x grows to the right from 0 and the baseline of
+line n is at y = -n * line_height, so the block grows downwards from y = 0.
+Widths are measured with string_metrics, in the units of get_string_length(); use
+a Romans-style font or a font from font_registry, whose strokes use the same scale.
+"""
+import math
+from bisect import bisect_right
+
+from string_metrics import measure_strings
+from viewport import clip_glyph
+
+
+class _Paragraph:
+    __slots__ = ('text', 'lines', 'widths', 'strokes')
+
+    def __init__(self, text, lines, widths):
+        self.text = text
+        self.lines = lines        # line texts
+        self.widths = widths      # line widths
+        self.strokes = None       # per line: (paths, ink bounds or None), built on first draw
+
+
+class TextBlock:
+    """
+    A wrapped, editable block of text in one font. `max_width` and `line_height`
+    are in the units of the font's get_string_length() and get_string().
+    """
+
+    def __init__(self, font, max_width, line_height, text=""):
+        self.font = font
+        self.max_width = max_width
+        self.line_height = line_height
+        self._space_kerning = {}   # char -> kerning between it and a following space
+        self._paragraphs = []
+        self._line_starts = [0]    # first line of every paragraph, and the total at the end
+        self._char_starts = [0]    # first character of every paragraph, and the total at the end
+        self._valid = 0            # the starts up to and including this paragraph are up to date
+        self.set_text(text)
+
+    # --- Layout ---
+
+    def _kerning_before_space(self, char):
+        kern = self._space_kerning.get(char)
+        if kern is None:
+            pair, single, space = measure_strings(self.font, [char + ' ', char, ' ']).tolist()
+            kern = self._space_kerning[char] = pair - single - space
+        return kern
+
+    def _layout(self, text):
+        """Breaks one paragraph into lines, greedily at spaces like wrap_and_draw()."""
+        words = text.split(' ')
+        measured = measure_strings(self.font, words + [' ' + word for word in words]).tolist()
+        widths, spaced = measured[:len(words)], measured[len(words):]
+
+        lines, line_widths = [], []
+        current, width = "", 0.0
+        for word, word_width, spaced_width in zip(words, widths, spaced):
+            if not current:
+                # Like wrap_and_draw(), a line never starts with the spaces between words.
+                current, width = word, word_width
+                continue
+            test_width = width + spaced_width + self._kerning_before_space(current[-1])
+            # The width is summed word by word, so allow for rounding when a line fits exactly.
+            if test_width > self.max_width * (1 + 1e-12):
+                lines.append(current)
+                line_widths.append(width)
+                current, width = word, word_width
+            else:
+                current += ' ' + word
+                width = test_width
+        if current or not lines:
+            # An empty paragraph still takes one (blank) line.
+            lines.append(current)
+            line_widths.append(width)
+        return _Paragraph(text, lines, line_widths)
+
+    def _update_starts(self, upto):
+        """Brings the line and character starts up to date up to paragraph `upto`."""
+        if self._valid >= upto:
+            return
+        line_starts, char_starts, paragraphs = self._line_starts, self._char_starts, self._paragraphs
+        for i in range(self._valid, upto):
+            line_starts[i + 1] = line_starts[i] + len(paragraphs[i].lines)
+            char_starts[i + 1] = char_starts[i] + len(paragraphs[i].text) + 1
+        self._valid = upto
+
+    def _find(self, starts, value):
+        """
+        Index of the paragraph whose range in `starts` (line or character starts)
+        holds `value`. The starts are only brought up to date as far as needed.
+        """
+        count = len(self._paragraphs)
+        while self._valid < count and starts[self._valid] <= value:
+            self._update_starts(min(self._valid + 64, count))
+        return bisect_right(starts, value, 0, min(self._valid, count - 1) + 1) - 1
+
+    def _splice(self, first, last, texts):
+        """Replaces paragraphs first..last-1 with newly laid out paragraphs of `texts`."""
+        new = [self._layout(text) for text in texts]
+        self._paragraphs[first:last] = new
+        self._line_starts[first + 1:last + 1] = [0] * len(new)
+        self._char_starts[first + 1:last + 1] = [0] * len(new)
+        self._valid = min(self._valid, first)
+
+    def set_text(self, text):
+        """Replaces the whole document and lays it out from scratch."""
+        self._paragraphs = []
+        self._line_starts = [0]
+        self._char_starts = [0]
+        self._valid = 0
+        self._splice(0, 0, text.split('\n'))
+
+    def reflow(self, max_width=None, font=None):
+        """Lays out every paragraph again, e.g. after a change of width or font."""
+        if max_width is not None:
+            self.max_width = max_width
+        if font is not None:
+            self.font = font
+            self._space_kerning = {}
+        self.set_text(self.text)
+
+    # --- Editing ---
+
+    def locate(self, offset):
+        """Maps a character offset in the document to (paragraph index, column)."""
+        index = self._find(self._char_starts, offset) if offset >= 0 else -1
+        if index < 0 or offset - self._char_starts[index] > len(self._paragraphs[index].text):
+            raise IndexError(f"offset {offset} is outside the text (length {len(self)})")
+        return index, offset - self._char_starts[index]
+
+    def replace(self, start, end, text):
+        """
+        Replaces the characters start..end of the document with `text`, which may
+        contain newlines. Only the paragraphs from the one holding `start` to the one
+        holding `end` are laid out again.
+        """
+        if end < start:
+            raise ValueError("replace() needs start <= end")
+        first, first_column = self.locate(start)
+        last, last_column = self.locate(end)
+        paragraphs = self._paragraphs
+        edited = paragraphs[first].text[:first_column] + text + paragraphs[last].text[last_column:]
+        self._splice(first, last + 1, edited.split('\n'))
+
+    def insert(self, offset, text):
+        """Inserts `text` at a character offset."""
+        self.replace(offset, offset, text)
+
+    def delete(self, start, end):
+        """Deletes the characters start..end."""
+        self.replace(start, end, "")
+
+    def set_paragraph(self, index, text):
+        """Replaces the text of one paragraph (which may split it into several)."""
+        self._splice(index, index + 1, text.split('\n'))
+
+    # --- Queries ---
+
+    @property
+    def text(self):
+        return '\n'.join(paragraph.text for paragraph in self._paragraphs)
+
+    def __len__(self):
+        self._update_starts(len(self._paragraphs))
+        return self._char_starts[-1] - 1
+
+    @property
+    def paragraph_count(self):
+        return len(self._paragraphs)
+
+    @property
+    def line_count(self):
+        self._update_starts(len(self._paragraphs))
+        return self._line_starts[-1]
+
+    @property
+    def height(self):
+        return self.line_count * self.line_height
+
+    def paragraph_lines(self, index):
+        """Returns the first line number and the (text, width) of every line of a paragraph."""
+        self._update_starts(index)
+        paragraph = self._paragraphs[index]
+        return self._line_starts[index], list(zip(paragraph.lines, paragraph.widths))
+
+    def lines(self):
+        """Yields (line text, width, baseline y) for every line of the block."""
+        y = 0.0
+        for paragraph in self._paragraphs:
+            for line, width in zip(paragraph.lines, paragraph.widths):
+                yield line, width, y
+                y -= self.line_height
+
+    # --- Drawing ---
+
+    def _strokes(self, paragraph):
+        if paragraph.strokes is None:
+            strokes = []
+            for line in paragraph.lines:
+                paths = self.font.get_string(line) if line else []
+                if paths:
+                    xs = [p[0] for path in paths for p in path]
+                    ys = [p[1] for path in paths for p in path]
+                    strokes.append((paths, (min(xs), min(ys), max(xs), max(ys))))
+                else:
+                    strokes.append((paths, None))
+            paragraph.strokes = strokes
+        return paragraph.strokes
+
+    def get_strokes(self, clip=None):
+        """
+        Returns the stroke paths of the block like get_string() does for one line.
+        With clip=(min_x, min_y, max_x, max_y), only the lines near the rectangle
+        are looked at (and drawn, if they were not yet) and the strokes are clipped to it.
+        """
+        if clip is None:
+            first_line, last_line = 0, self.line_count - 1
+        else:
+            # How far strokes reach above and below their baseline: the font's ink bounds
+            # if it has them, otherwise assume one line height.
+            ink = getattr(self.font, 'ink', None)
+            if ink is not None:
+                above, below = max(ink[3], 0) * self.font.scale, max(-ink[1], 0) * self.font.scale
+            else:
+                above = below = self.line_height
+            first_line = max(math.floor(-(clip[3] + below) / self.line_height), 0)
+            last_line = math.ceil(-(clip[1] - above) / self.line_height)
+
+        out = []
+        index = self._find(self._line_starts, first_line)
+        while index < len(self._paragraphs) and self._line_starts[index] <= last_line:
+            self._update_starts(index + 1)
+            start = self._line_starts[index]
+            for number, (paths, bounds) in enumerate(self._strokes(self._paragraphs[index]), start):
+                if bounds is None or not first_line <= number <= last_line:
+                    continue
+                dy = -number * self.line_height
+                if clip is None:
+                    out.extend([(x, y + dy) for x, y in path] for path in paths)
+                    continue
+                min_x, min_y, max_x, max_y = bounds
+                min_y, max_y = min_y + dy, max_y + dy
+                if max_x < clip[0] or min_x > clip[2] or max_y < clip[1] or min_y > clip[3]:
+                    continue
+                moved = [[(x, y + dy) for x, y in path] for path in paths]
+                out.extend(clip_glyph(moved, clip, (min_x, min_y, max_x, max_y)))
+            index += 1
+        return out
@@ -0,0 +1,137 @@
+"""
+Clipping helpers for viewport culling in the fonts' get_string(line, clip=...).
+
+A clip rectangle is (min_x, min_y, max_x, max_y) in the coordinates returned by
+get_string(). The fonts compute the ink bounds of their glyphs once with
+ink_bounds() and lay out clipped strings with clip_string(), which rejects whole
+glyphs by their advance and ink bounds and only passes the glyphs that cross the
+rectangle's edge to clip_polyline().
+"""
+
+
+def ink_bounds(glyphs):
+    """
+    Ink bounds of a font's glyphs, {key: paths}. Returns {key: (min_x, min_y, max_x, max_y)}
+    for every glyph with ink, and the union of all of them ((0, 0, 0, 0) without any).
+    """
+    bounds = {}
+    for key, paths in glyphs.items():
+        xs = [p[0] for path in paths for p in path]
+        ys = [p[1] for path in paths for p in path]
+        if xs:
+            bounds[key] = (min(xs), min(ys), max(xs), max(ys))
+    if not bounds:
+        return bounds, (0.0, 0.0, 0.0, 0.0)
+    return bounds, tuple(f(b[j] for b in bounds.values()) for j, f in enumerate((min, min, max, max)))
+
+
+def clip_segment(x0, y0, x1, y1, rect):
+    """Liang-Barsky clipping of one segment; returns the visible end points or None."""
+    min_x, min_y, max_x, max_y = rect
+    dx, dy = x1 - x0, y1 - y0
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x0 - min_x), (dx, max_x - x0), (-dy, y0 - min_y), (dy, max_y - y0)):
+        if p == 0:
+            if q < 0:
+                return None
+        else:
+            r = q / p
+            if p < 0:
+                if r > t1:
+                    return None
+                if r > t0:
+                    t0 = r
+            else:
+                if r < t0:
+                    return None
+                if r < t1:
+                    t1 = r
+    return (x0 + t0 * dx, y0 + t0 * dy), (x0 + t1 * dx, y0 + t1 * dy)
+
+
+def clip_polyline(path, rect):
+    """
+    Clips a polyline to `rect` and returns the visible pieces as a list of paths.
+    A path that leaves and re-enters the rectangle is split at the crossings.
+    """
+    if len(path) == 1:
+        x, y = path[0]
+        min_x, min_y, max_x, max_y = rect
+        return [list(path)] if min_x <= x <= max_x and min_y <= y <= max_y else []
+
+    pieces = []
+    current = []
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        visible = clip_segment(x0, y0, x1, y1, rect)
+        if visible is None:
+            if current:
+                pieces.append(current)
+                current = []
+            continue
+        start, end = visible
+        if not current or current[-1] != start:
+            if current:
+                pieces.append(current)
+            current = [start]
+        current.append(end)
+        if end != (x1, y1):
+            # The segment leaves the rectangle: the next visible part starts a new piece.
+            pieces.append(current)
+            current = []
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def clip_glyph(paths, rect, glyph_bounds):
+    """
+    Clips the already positioned paths of one glyph. `glyph_bounds` are the glyph's
+    positioned ink bounds; glyphs completely inside the rectangle are returned as-is.
+    """
+    min_x, min_y, max_x, max_y = rect
+    g_min_x, g_min_y, g_max_x, g_max_y = glyph_bounds
+    if g_min_x >= min_x and g_max_x <= max_x and g_min_y >= min_y and g_max_y <= max_y:
+        return paths
+    out = []
+    for path in paths:
+        out.extend(clip_polyline(path, rect))
+    return out
+
+
+def clip_string(keys, rect, scale, advance, glyph_paths, bounds, ink, kern_after=None, min_kern=0.0, flip_y=False):
+    """
+    The get_string() of a stroke font, clipped to `rect`. Glyphs outside the rectangle
+    are rejected by their advance and ink bounds without transforming any point, and
+    layout stops once the pen has passed the right edge (allowing for glyphs that
+    reach left of their origin and for the tightest kerning, `min_kern`).
+
+    `keys` are the glyph keys of the string (ordinals or characters). In font units:
+    advance(key) is the advance width, glyph_paths(key) the stroke paths, `bounds` and
+    `ink` the per-glyph and overall ink bounds from ink_bounds(), and `kern_after`
+    ({a: {b: kern}}, optional) the kerning pairs grouped by their first glyph. With
+    `flip_y` the glyphs have y running down and are flipped like in get_string().
+    """
+    min_x, min_y, max_x, max_y = rect
+    s = scale
+    sy = -s if flip_y else s
+    out = []
+    if min(ink[1] * sy, ink[3] * sy) > max_y or max(ink[1] * sy, ink[3] * sy) < min_y:
+        return out
+    reach = (min(ink[0], 0) + min(min_kern, 0)) * s
+    x = 0
+    row = None # Kerning pairs starting with the previous glyph
+    for key in keys:
+        if x + reach > max_x:
+            break
+        if row:
+            x += row.get(key, 0) * s
+        row = kern_after.get(key) if kern_after else None
+        b = bounds.get(key)
+        if b:
+            x0, x1 = b[0] * s + x, b[2] * s + x
+            y0, y1 = (b[3] * sy, b[1] * sy) if flip_y else (b[1] * sy, b[3] * sy)
+            if x1 >= min_x and x0 <= max_x and y1 >= min_y and y0 <= max_y:
+                paths = [[(p[0] * s + x, p[1] * sy) for p in path] for path in glyph_paths(key)]
+                out.extend(clip_glyph(paths, rect, (x0, y0, x1, y1)))
+        x += advance(key) * s
+    return out
@@ -1,17 +1,34 @@
 import sys
 import math
 import random
+import heapq
 import glob
 import os
+import time
+import hashlib
+import argparse
+import json
+import tempfile
+import mmap
+import struct
+import zipfile
+from collections.abc import Mapping
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from collections import namedtuple
 
 from romans_font import Romans
+from sized_font import SizedFont
+from pdf_writer import PDFPage, PDFWriter
+from string_metrics import measure_strings
+from outline import get_outliner
+from raster_preview import render_bin_preview, make_contact_sheet, save_png, to_uint8
 
 from shapely.geometry import Polygon, MultiPolygon, Point
 from shapely.ops import nearest_points
+from shapely.strtree import STRtree
+import shapely
 import numpy as np
 
 
@@ -47,6 +64,12 @@ def most_inland_point(polygon_points, step=0.1):
     return (inland_point.x, inland_point.y), radius * 2
 
 
+BinDimension = namedtuple('BinDimension', ['width', 'height'])
+
+# Bumped whenever the layout of the compiled problem file changes.
+COMPILED_PROBLEM_VERSION = 1
+
+
 def get_polygon_bbox(points):
     """Calculates the bounding box of a polygon."""
     if not points:
@@ -58,89 +81,290 @@ def get_polygon_bbox(points):
     return min_x, min_y, max_x, max_y
 
 
-def parse_problem_file(file_path):
+def _parse_point(token):
+    """Parses one "x,y" token of a piece line; returns None if it is not a coordinate pair."""
+    try:
+        x_str, y_str = token.split(',')
+        return float(x_str), float(y_str)
+    except ValueError:
+        return None
+
+
+def parse_problem_file(file_path, piece_ids=None):
     """
     Parses the problem file to extract original piece geometries, their initial
     bounding boxes, and the bin dimensions.
+
+    If `piece_ids` is given, only those pieces are parsed: the other piece lines are
+    only counted, and reading stops after the highest requested id.
     """
     original_pieces_data = {}
+    last_id = max(piece_ids, default=0) if piece_ids is not None else None
     with open(file_path, 'r') as f:
-        lines = f.readlines()
+        bin_width, bin_height = map(float, f.readline().strip().split())
+        bin_dimension = BinDimension(width=bin_width, height=bin_height)
+        f.readline()
 
-    BinDimension = namedtuple('BinDimension', ['width', 'height'])
-    bin_width, bin_height = map(float, lines[0].strip().split())
-    bin_dimension = BinDimension(width=bin_width, height=bin_height)
-
-    piece_id_counter = 1
-    for line in lines[2:]:
-        line = line.strip()
-        if not line:
-            continue
-        
-        points_str = line.split(' ')
-        vertices = []
-        for point_str in points_str:
-            try:
-                x_str, y_str = point_str.split(',')
-                vertices.append((float(x_str), float(y_str)))
-            except ValueError:
+        piece_id_counter = 1
+        for line in f:
+            if last_id is not None and piece_id_counter > last_id:
+                break
+            line = line.strip()
+            if not line:
                 continue
-        
-        if vertices:
-            min_x, min_y, max_x, max_y = get_polygon_bbox(vertices)
-            # The rotation pivot is the center of the piece's initial bounding box.
-            pivot_x = min_x + (max_x - min_x) / 2
-            pivot_y = min_y + (max_y - min_y) / 2
-            original_pieces_data[piece_id_counter] = (vertices, (pivot_x, pivot_y))
-            piece_id_counter += 1
-            
+            points_str = line.split(' ')
+            if piece_ids is not None and piece_id_counter not in piece_ids:
+                # Counted like below (a line is a piece if any token is a coordinate pair),
+                # but only parsed up to its first valid point.
+                if any(_parse_point(point_str) is not None for point_str in points_str):
+                    piece_id_counter += 1
+                continue
+
+            vertices = [vertex for vertex in map(_parse_point, points_str) if vertex is not None]
+
+            if vertices:
+                min_x, min_y, max_x, max_y = get_polygon_bbox(vertices)
+                # The rotation pivot is the center of the piece's initial bounding box.
+                pivot_x = min_x + (max_x - min_x) / 2
+                pivot_y = min_y + (max_y - min_y) / 2
+                original_pieces_data[piece_id_counter] = (vertices, (pivot_x, pivot_y))
+                piece_id_counter += 1
+
     return bin_dimension, original_pieces_data
 
 
-def parse_bin_files():
+class CompiledPieces(Mapping):
     """
-    Parses all Bin-*.txt files in the current directory to get placement data.
+    Read-only mapping from piece id to (vertices, rotation pivot), backed by the flat
+    arrays of a compiled problem file. Vertices are returned as (n, 2) array views,
+    so nothing is copied until a piece is actually used.
     """
-    bins_data = []
-    # Glob for files and sort them numerically based on the number in the filename.
-    # This correctly handles cases like Bin-1.txt, Bin-2.txt, Bin-10.txt.
-    bin_files = sorted(
-        glob.glob('Bin-*.txt'),
-        key=lambda f: int(os.path.basename(f).replace('Bin-', '').replace('.txt', ''))
-    )
 
-    for bin_file in bin_files:
+    def __init__(self, piece_ids, vertices, offsets, pivots):
+        self.piece_ids = piece_ids
+        self.vertices = vertices
+        self.offsets = offsets
+        self.pivots = pivots
+        self._index = {piece_id: i for i, piece_id in enumerate(piece_ids.tolist())}
+
+    def __getitem__(self, piece_id):
+        i = self._index[piece_id]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.vertices[start:end], (float(self.pivots[i, 0]), float(self.pivots[i, 1]))
+
+    def __contains__(self, piece_id):
+        return piece_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+def compiled_problem_path(file_path):
+    """The compiled form of a problem file is stored next to it, e.g. S266.txt -> S266.txt.npz."""
+    return file_path + '.npz'
+
+
+def write_compiled_problem(file_path, source_hash, bin_dimension, original_pieces_data):
+    """
+    Writes the parsed problem as an uncompressed .npz file: bin dimensions, all
+    vertices in one flat (n, 2) array, per-piece offsets into it, rotation pivots and
+    the SHA-256 of the source text. The file is written atomically.
+    """
+    piece_ids = sorted(original_pieces_data)
+    counts = [len(original_pieces_data[piece_id][0]) for piece_id in piece_ids]
+    offsets = np.zeros(len(piece_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    vertices = np.array([p for piece_id in piece_ids for p in original_pieces_data[piece_id][0]], dtype=np.float64).reshape(-1, 2)
+    pivots = np.array([original_pieces_data[piece_id][1] for piece_id in piece_ids], dtype=np.float64).reshape(-1, 2)
+
+    # Every writer gets its own temporary file next to the cache, so concurrent writers
+    # never share one and only complete files are renamed into place.
+    compiled_path = compiled_problem_path(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(compiled_path)),
+                                    prefix=os.path.basename(compiled_path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f,
+                     version=np.array([COMPILED_PROBLEM_VERSION], dtype=np.int64),
+                     source_hash=np.frombuffer(source_hash, dtype=np.uint8),
+                     bin_dimension=np.array(bin_dimension, dtype=np.float64),
+                     piece_ids=np.array(piece_ids, dtype=np.int64),
+                     vertices=vertices, offsets=offsets, pivots=pivots)
+        os.replace(tmp_path, compiled_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def mmap_npz(path):
+    """
+    Memory-maps the arrays of an uncompressed .npz file. np.load() ignores mmap_mode
+    for .npz archives, so the members are located through the zip headers and wrapped
+    as ndarrays over a shared read-only mmap instead of being read into memory.
+    """
+    arrays = {}
+    with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {info.filename} is compressed and cannot be memory-mapped")
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            arrays[info.filename[:-len('.npy')]] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=f.tell(),
+                                                              order='F' if fortran_order else 'C')
+    return arrays
+
+
+def load_problem(file_path, use_cache=True, piece_ids=None):
+    """
+    Loads a problem file through its compiled .npz cache. The cache is used when its
+    stored SHA-256 matches the current source text; otherwise the text is parsed with
+    parse_problem_file() and the cache is (re)written next to it. Returns the same
+    (bin_dimension, original_pieces_data) pair as parse_problem_file(), where the
+    pieces mapping is a CompiledPieces view over memory-mapped arrays when possible.
+
+    With `piece_ids`, only those pieces are needed. A valid cache is still used (its
+    memory-mapped pieces are only read when touched), but without one only the
+    requested pieces are parsed and no partial cache is written.
+    """
+    if not use_cache:
+        return parse_problem_file(file_path, piece_ids)
+
+    with open(file_path, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).digest()
+
+    compiled_path = compiled_problem_path(file_path)
+    try:
+        arrays = mmap_npz(compiled_path)
+        if (int(arrays['version'][0]) == COMPILED_PROBLEM_VERSION
+                and arrays['source_hash'].tobytes() == source_hash):
+            bin_dimension = BinDimension(*arrays['bin_dimension'].tolist())
+            return bin_dimension, CompiledPieces(arrays['piece_ids'], arrays['vertices'], arrays['offsets'], arrays['pivots'])
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass  # Missing, stale or unreadable cache: rebuild it below.
+
+    if piece_ids is not None:
+        return parse_problem_file(file_path, piece_ids)
+    bin_dimension, original_pieces_data = parse_problem_file(file_path)
+    try:
+        write_compiled_problem(file_path, source_hash, bin_dimension, original_pieces_data)
+    except OSError as e:
+        print(f"  - Warning: Could not write compiled problem cache {compiled_path}: {e}")
+    return bin_dimension, original_pieces_data
+
+
+def bin_number_from_path(bin_file):
+    """Extracts the bin number from a Bin-<n>.txt file name, or None if it does not match."""
+    try:
+        return int(os.path.basename(bin_file).replace('Bin-', '').replace('.txt', ''))
+    except ValueError:
+        return None
+
+
+def parse_bin_selection(text):
+    """
+    Parses a bin selection such as "3,5,10-20" into a set of bin numbers.
+    Raises ValueError for malformed or empty selections.
+    """
+    bins = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
         try:
-            bin_number = int(os.path.basename(bin_file).replace('Bin-', '').replace('.txt', ''))
+            first = int(first)
+            last = int(last) if dash else first
         except ValueError:
-            continue  # Skip if file name is not in the expected format
-
-        placed_pieces = []
-        with open(bin_file, 'r') as f:
-            lines = f.readlines()
-        
-        # First line is number of pieces, we can skip it.
-        for line in lines[1:]:
-            line = line.strip()
-            if not line:
-                continue
-            
-            parts = line.split()
-            if len(parts) < 3:
-                continue
-            
-            piece_id = int(parts[0])
-            rotation = float(parts[1])
-            x_str, y_str = parts[2].split(',')
-            x = float(x_str)
-            y = float(y_str)
-            
-            placed_pieces.append({'id': piece_id, 'rotation': rotation, 'x': x, 'y': y})
-        
-        if placed_pieces:
-            bins_data.append({'number': bin_number, 'placed_pieces': placed_pieces})
-    
-    return bins_data
+            raise ValueError(f"invalid bin selection {part!r}; expected numbers or ranges like 3,5,10-20") from None
+        if first < 1 or last < first:
+            raise ValueError(f"invalid bin range {part!r}")
+        bins.update(range(first, last + 1))
+    if not bins:
+        raise ValueError("empty bin selection")
+    return bins
+
+
+def find_bin_files(directory='.', bins=None):
+    """
+    Returns the Bin-*.txt files in a directory, sorted numerically by bin number.
+    This correctly handles cases like Bin-1.txt, Bin-2.txt, Bin-10.txt.
+    If `bins` is given, only the files of those bin numbers are returned; the
+    selection is made on the file names, so no other file is opened.
+    """
+    bin_files = [f for f in glob.glob(os.path.join(directory, 'Bin-*.txt')) if bin_number_from_path(f) is not None]
+    if bins is not None:
+        bin_files = [f for f in bin_files if bin_number_from_path(f) in bins]
+    return sorted(bin_files, key=bin_number_from_path)
+
+
+def parse_bin_file(bin_file):
+    """
+    Parses a single Bin-*.txt file. Returns None if the file name is not in the
+    expected format or the file contains no placements.
+    """
+    bin_number = bin_number_from_path(bin_file)
+    if bin_number is None:
+        return None
+
+    placed_pieces = []
+    with open(bin_file, 'r') as f:
+        lines = f.readlines()
+
+    # First line is number of pieces, we can skip it.
+    for line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+
+        piece_id = int(parts[0])
+        rotation = float(parts[1])
+        x_str, y_str = parts[2].split(',')
+        x = float(x_str)
+        y = float(y_str)
+
+        placed_pieces.append({'id': piece_id, 'rotation': rotation, 'x': x, 'y': y})
+
+    if not placed_pieces:
+        return None
+    return {'number': bin_number, 'placed_pieces': placed_pieces}
+
+
+def iter_bins(bin_files):
+    """
+    Parses the given Bin-*.txt files one at a time, skipping empty or malformed ones.
+    Only the bin being yielded is held in memory.
+    """
+    for bin_file in bin_files:
+        bin_info = parse_bin_file(bin_file)
+        if bin_info is not None:
+            yield bin_info
+
+
+def parse_bin_files(directory='.', bins=None):
+    """
+    Parses all Bin-*.txt files in a directory (the current one by default) to get placement data.
+    If `bins` is given, only the files of those bin numbers are parsed.
+    """
+    return list(iter_bins(find_bin_files(directory, bins)))
+
+
+def referenced_piece_ids(bins_data):
+    """Returns the set of piece ids placed in the given bins."""
+    return {piece['id'] for bin_info in bins_data for piece in bin_info['placed_pieces']}
 
 
 def rotate_point(point, angle_degrees, center):
@@ -162,211 +386,761 @@ def rotate_point(point, angle_degrees, center):
     
     return new_x, new_y
 
-def create_packing_visual_pdf(bins_data, bin_dimension, original_pieces_data, file_name="nesting_visualization_from_files.pdf"):
+# Define pastel colors with 60% opacity (alpha=0.6)
+PASTEL_COLORS = [
+    colors.Color(0.9569, 0.7608, 0.7608, alpha=0.6),  # Light Pink
+    colors.Color(0.7608, 0.9569, 0.7608, alpha=0.6),  # Light Green
+    colors.Color(0.7608, 0.7608, 0.9569, alpha=0.6),  # Light Blue
+    colors.Color(0.9569, 0.9569, 0.7608, alpha=0.6),  # Light Yellow
+    colors.Color(0.9569, 0.7608, 0.9569, alpha=0.6),  # Light Purple
+    colors.Color(0.7608, 0.9569, 0.9569, alpha=0.6),  # Light Cyan
+    colors.Color(0.9569, 0.8471, 0.7608, alpha=0.6),  # Light Peach
+    colors.Color(0.8471, 0.9569, 0.7608, alpha=0.6),  # Light Mint
+    colors.Color(0.7608, 0.8471, 0.9569, alpha=0.6),  # Light Lavender
+    colors.Color(0.9569, 0.7608, 0.8471, alpha=0.6),  # Light Coral
+    colors.Color(1.0, 0.627, 0.478, alpha=0.6),       # Light Salmon
+    colors.Color(0.686, 0.933, 0.933, alpha=0.6),       # Pale Turquoise
+    colors.Color(0.941, 0.902, 0.549, alpha=0.6),       # Khaki
+    colors.Color(0.847, 0.749, 0.847, alpha=0.6),       # Thistle
+    colors.Color(0.596, 0.984, 0.596, alpha=0.6),       # Pale Green
+    colors.Color(0.69, 0.769, 0.871, alpha=0.6),        # Light Steel Blue
+    colors.Color(1.0, 0.894, 0.71, alpha=0.6),         # Moccasin
+    colors.Color(0.69, 0.878, 0.902, alpha=0.6),        # Powder Blue
+    colors.Color(0.98, 0.98, 0.824, alpha=0.6),        # Light Goldenrod Yellow
+    colors.Color(0.855, 0.439, 0.839, alpha=0.6),       # Orchid
+]
+# Expand the palette to handle complex layouts with many adjacent pieces, reducing color reuse.
+PASTEL_COLORS.extend([
+    colors.Color(0.933, 0.823, 0.933, alpha=0.6),      # Plum
+    colors.Color(0.96, 0.80, 0.69, alpha=0.6),         # Light Tan
+    colors.Color(0.529, 0.808, 0.922, alpha=0.6),      # Sky Blue
+    colors.Color(0.87, 0.95, 0.7, alpha=0.6),          # Light Lime
+    colors.Color(1.0, 0.75, 0.79, alpha=0.6),          # Pink
+    colors.Color(0.8, 0.9, 0.9, alpha=0.6),            # Light Teal
+    colors.Color(0.9, 0.9, 0.8, alpha=0.6),            # Beige
+    colors.Color(1.0, 0.84, 0.0, alpha=0.6),           # Gold
+    colors.Color(0.74, 0.83, 0.9, alpha=0.6),          # Light Periwinkle
+    colors.Color(0.9, 0.7, 0.7, alpha=0.6),            # Dusty Rose
+])
+
+
+def place_piece(original_vertices, rotation_pivot, rotation_angle, x, y):
     """
-    Creates a PDF visualizing the nesting result by reading placement from files.
+    Rotates a piece around its pivot like rotate_point() and translates it so that the
+    bottom-left corner of its rotated bounding box lands on (x, y). Works on all
+    vertices at once; returns the placed vertices as a list of (x, y) tuples.
     """
-    c = canvas.Canvas(file_name, pagesize=(bin_dimension.width + 50, bin_dimension.height + 50))
-    font = Romans()
-    
-    # Define pastel colors with 60% opacity (alpha=0.6)
-    pastel_colors = [
-        colors.Color(0.9569, 0.7608, 0.7608, alpha=0.6),  # Light Pink
-        colors.Color(0.7608, 0.9569, 0.7608, alpha=0.6),  # Light Green
-        colors.Color(0.7608, 0.7608, 0.9569, alpha=0.6),  # Light Blue
-        colors.Color(0.9569, 0.9569, 0.7608, alpha=0.6),  # Light Yellow
-        colors.Color(0.9569, 0.7608, 0.9569, alpha=0.6),  # Light Purple
-        colors.Color(0.7608, 0.9569, 0.9569, alpha=0.6),  # Light Cyan
-        colors.Color(0.9569, 0.8471, 0.7608, alpha=0.6),  # Light Peach
-        colors.Color(0.8471, 0.9569, 0.7608, alpha=0.6),  # Light Mint
-        colors.Color(0.7608, 0.8471, 0.9569, alpha=0.6),  # Light Lavender
-        colors.Color(0.9569, 0.7608, 0.8471, alpha=0.6),  # Light Coral
-        colors.Color(1.0, 0.627, 0.478, alpha=0.6),       # Light Salmon
-        colors.Color(0.686, 0.933, 0.933, alpha=0.6),       # Pale Turquoise
-        colors.Color(0.941, 0.902, 0.549, alpha=0.6),       # Khaki
-        colors.Color(0.847, 0.749, 0.847, alpha=0.6),       # Thistle
-        colors.Color(0.596, 0.984, 0.596, alpha=0.6),       # Pale Green
-        colors.Color(0.69, 0.769, 0.871, alpha=0.6),        # Light Steel Blue
-        colors.Color(1.0, 0.894, 0.71, alpha=0.6),         # Moccasin
-        colors.Color(0.69, 0.878, 0.902, alpha=0.6),        # Powder Blue
-        colors.Color(0.98, 0.98, 0.824, alpha=0.6),        # Light Goldenrod Yellow
-        colors.Color(0.855, 0.439, 0.839, alpha=0.6),       # Orchid
-    ]
-    # Expand the palette to handle complex layouts with many adjacent pieces, reducing color reuse.
-    pastel_colors.extend([
-        colors.Color(0.933, 0.823, 0.933, alpha=0.6),      # Plum
-        colors.Color(0.96, 0.80, 0.69, alpha=0.6),         # Light Tan
-        colors.Color(0.529, 0.808, 0.922, alpha=0.6),      # Sky Blue
-        colors.Color(0.87, 0.95, 0.7, alpha=0.6),          # Light Lime
-        colors.Color(1.0, 0.75, 0.79, alpha=0.6),          # Pink
-        colors.Color(0.8, 0.9, 0.9, alpha=0.6),            # Light Teal
-        colors.Color(0.9, 0.9, 0.8, alpha=0.6),            # Beige
-        colors.Color(1.0, 0.84, 0.0, alpha=0.6),           # Gold
-        colors.Color(0.74, 0.83, 0.9, alpha=0.6),          # Light Periwinkle
-        colors.Color(0.9, 0.7, 0.7, alpha=0.6),            # Dusty Rose
-    ])
-    for bin_info in bins_data:
-        print(f"Drawing Bin {bin_info['number']}...")
-        c.setPageSize((bin_dimension.width + 50, bin_dimension.height + 50))
-        c.setStrokeColor(colors.lightgrey)
-        c.translate(25, 48)
-        c.rect(0, 0, bin_dimension.width, bin_dimension.height)
-        
-        # --- Pre-computation for coloring ---
-        all_final_vertices = []
-        all_polygons = []
-        for piece_info in bin_info['placed_pieces']:
-            piece_id = piece_info['id']
-            if piece_id not in original_pieces_data:
-                all_final_vertices.append(None)
-                all_polygons.append(None)
-                continue
+    points = np.asarray(original_vertices, dtype=np.float64)
+    angle_rad = math.radians(360 - rotation_angle)
+    cos_theta, sin_theta = math.cos(angle_rad), math.sin(angle_rad)
+    cx, cy = rotation_pivot
+    dx, dy = points[:, 0] - cx, points[:, 1] - cy
+    rotated_x = cos_theta * dx - sin_theta * dy + cx
+    rotated_y = sin_theta * dx + cos_theta * dy + cy
+    final = np.column_stack((rotated_x + (x - rotated_x.min()), rotated_y + (y - rotated_y.min())))
+    return list(map(tuple, final.tolist()))
 
-            # --- Transformation Logic ---
-            original_vertices, rotation_pivot = original_pieces_data[piece_id]
-            rotation_angle = piece_info['rotation']
-            rotated_vertices = [rotate_point(p, rotation_angle, rotation_pivot) for p in original_vertices]
-            final_placed_x = piece_info['x']
-            final_placed_y = piece_info['y']
-            rotated_min_x, rotated_min_y, _, _ = get_polygon_bbox(rotated_vertices)
-            translation_x = final_placed_x - rotated_min_x
-            translation_y = final_placed_y - rotated_min_y
-            final_vertices = [(p[0] + translation_x, p[1] + translation_y) for p in rotated_vertices]
-            
-            all_final_vertices.append(final_vertices)
-            polygon = Polygon(final_vertices)
-            if not polygon.is_valid:
-                polygon = polygon.buffer(0)
-            all_polygons.append(polygon)
-
-        # --- Adjacency Graph and Coloring ---
-        num_pieces = len(all_polygons)
-        adjacency_list = [[] for _ in range(num_pieces)]
-        for i in range(num_pieces):
-            if all_polygons[i] is None or all_polygons[i].is_empty:
-                continue
-            for j in range(i + 1, num_pieces):
-                if all_polygons[j] is None or all_polygons[j].is_empty:
-                    continue
-                # Use distance check with a small tolerance to find adjacent pieces.
-                # This is more robust than buffer().intersects() for floating point inaccuracies.
-                # Increased tolerance to catch pieces that are visually close but not perfectly touching.
-                if all_polygons[i].distance(all_polygons[j]) < 1.0:
-                    adjacency_list[i].append(j)
-                    adjacency_list[j].append(i)
-
-        # --- Degree-based Greedy Coloring ---
-        # A more sophisticated greedy coloring. By coloring the nodes with the highest
-        # degree (most neighbors) first, we are more likely to find an optimal coloring
-        # and avoid running out of palette colors for complex layouts. This approach is
-        # deterministic and generally more effective than a random-order coloring.
-        piece_to_color_map = {}  # Maps piece index to a reportlab color object
-
-        # Calculate the degree of each piece (number of neighbors)
-        degrees = [(i, len(adj)) for i, adj in enumerate(adjacency_list)]
-        # Sort pieces by degree in descending order
-        sorted_piece_indices = [i for i, degree in sorted(degrees, key=lambda x: x[1], reverse=True)]
-
-        for i in sorted_piece_indices:
-            # Get the actual color objects of already-colored neighbors
-            neighbor_colors = {piece_to_color_map.get(neighbor) for neighbor in adjacency_list[i] if neighbor in piece_to_color_map}
-
-            # Find colors from the palette that are not used by neighbors
-            available_colors = [c for c in pastel_colors if c not in neighbor_colors]
-
-            if not available_colors:
-                # This case occurs if a piece is adjacent to more pieces than there are available colors.
-                # We must reuse a color. We'll pick one at random and print a warning.
-                print(f"  - Warning: Could not find a unique color for a piece (index {i}). The palette might be too small for this complex layout. Assigning a random color.")
-                chosen_color = random.choice(pastel_colors)
-            else:
-                # From the non-clashing colors, pick one at random to ensure better color distribution
-                # and avoid the "fewer colors" look of a purely deterministic choice.
-                chosen_color = random.choice(available_colors)
-            piece_to_color_map[i] = chosen_color
-
-        # --- Drawing Loop ---
-        for i, piece_info in enumerate(bin_info['placed_pieces']):
-            final_vertices = all_final_vertices[i]
-            piece_id = piece_info['id']
-            if final_vertices is None:
-                print(f"  - Warning: Could not find original geometry for Piece ID: {piece_id}")
-                continue
 
-            # --- Drawing Logic ---
+def build_adjacency(polygons, tolerance=1.0):
+    """
+    Builds the adjacency list of the pieces in a bin. Two pieces are adjacent when
+    they are closer than `tolerance`, which is more robust than buffer().intersects()
+    for floating point inaccuracies and catches pieces that are visually close but
+    not perfectly touching. Candidate pairs come from an STRtree query, so the cost
+    grows with the number of neighbours instead of with the square of the piece count.
+    None or empty polygons get no neighbours.
+    """
+    adjacency_list = [[] for _ in polygons]
+    indices = [i for i, polygon in enumerate(polygons) if polygon is not None and not polygon.is_empty]
+    if not indices:
+        return adjacency_list
+
+    geometries = [polygons[i] for i in indices]
+    tree = STRtree(geometries)
+    left, right = tree.query(geometries, predicate='dwithin', distance=tolerance)
+    for a, b in zip(left.tolist(), right.tolist()):
+        if a < b:
+            i, j = indices[a], indices[b]
+            adjacency_list[i].append(j)
+            adjacency_list[j].append(i)
+    return adjacency_list
+
+
+def dsatur_coloring(adjacency_list, num_colors, seed=0):
+    """
+    Colors a graph with the DSATUR heuristic and returns one palette index per node.
+
+    The next node to color is always the one whose neighbours already use the most
+    distinct colors (its saturation), with ties broken by degree and then by a seeded
+    random key. The colors used around each node are kept as an integer bitmask, and
+    the candidates are kept in a priority queue with lazy deletion, so each coloring
+    step costs O(log n) plus the node's degree. Among the colors not used by any
+    neighbour one is picked at random to avoid the "fewer colors" look of always
+    taking the lowest index; all randomness comes from `seed`, so the result is
+    reproducible. When every color is taken by a neighbour, the color shared with
+    the fewest neighbours is reused and a warning is printed.
+    """
+    rng = random.Random(seed)
+    num_nodes = len(adjacency_list)
+    all_colors = (1 << num_colors) - 1
+    neighbor_masks = [0] * num_nodes
+    saturation = [0] * num_nodes
+    tie_breaks = [rng.random() for _ in range(num_nodes)]
+    color_indices = [None] * num_nodes
+
+    heap = [(0, -len(adj), tie_breaks[i], i) for i, adj in enumerate(adjacency_list)]
+    heapq.heapify(heap)
+    while heap:
+        neg_saturation, _, _, i = heapq.heappop(heap)
+        if color_indices[i] is not None or -neg_saturation != saturation[i]:
+            continue  # Stale entry, the node was colored or its saturation grew.
+
+        available = all_colors & ~neighbor_masks[i]
+        if available:
+            candidates = [k for k in range(num_colors) if available >> k & 1]
+            color = rng.choice(candidates)
+        else:
+            # This case occurs if a piece is adjacent to more pieces than there are available colors.
+            print(f"  - Warning: Could not find a unique color for a piece (index {i}). The palette might be too small for this complex layout. Reusing the least conflicting color.")
+            usage = [0] * num_colors
+            for neighbor in adjacency_list[i]:
+                if color_indices[neighbor] is not None:
+                    usage[color_indices[neighbor]] += 1
+            color = min(range(num_colors), key=lambda k: usage[k])
+        color_indices[i] = color
+
+        bit = 1 << color
+        for neighbor in adjacency_list[i]:
+            if color_indices[neighbor] is None and not neighbor_masks[neighbor] & bit:
+                neighbor_masks[neighbor] |= bit
+                saturation[neighbor] += 1
+                heapq.heappush(heap, (-saturation[neighbor], -len(adjacency_list[neighbor]), tie_breaks[neighbor], neighbor))
+
+    return color_indices
+
+
+def validate_bin(bin_number, piece_ids, polygons, bin_dimension, min_area=1e-6):
+    """
+    Checks the placement of one bin and returns a JSON-serializable report with the
+    overlapping piece pairs and their overlap area, the pieces that cross the bin
+    rectangle and the bin utilisation. Candidate pairs come from an STRtree query and
+    all areas are computed with vectorized shapely array operations, so bins with tens
+    of thousands of parts stay fast. Overlaps and excursions smaller than `min_area`
+    (pieces that merely touch) are ignored. Pieces without geometry (None) are listed
+    under 'missing_pieces'.
+
+    layout_bin() adds 'labels_outside', the pieces whose label outline (the strokes
+    expanded to the 1 point PDF line width) does not fit inside the piece.
+
+    The report also carries 'overlap_regions', the exterior rings of the overlaps,
+    which the drawing functions use to highlight problems; drop it before serializing
+    if only the numbers are needed.
+    """
+    bin_area = bin_dimension.width * bin_dimension.height
+    present = [i for i, polygon in enumerate(polygons) if polygon is not None and not polygon.is_empty]
+    report = {
+        'bin': bin_number,
+        'piece_count': len(piece_ids),
+        'missing_pieces': [piece_ids[i] for i, polygon in enumerate(polygons) if polygon is None],
+        'bin_area': bin_area,
+        'used_area': 0.0,
+        'utilisation': 0.0,
+        'overlaps': [],
+        'out_of_bin': [],
+        'overlap_regions': [],
+    }
+    if not present:
+        return report
+
+    geometries = np.array([polygons[i] for i in present], dtype=object)
+    areas = shapely.area(geometries)
+    report['used_area'] = float(areas.sum())
+    report['utilisation'] = report['used_area'] / bin_area if bin_area else 0.0
+
+    # --- Overlapping pairs ---
+    left, right = STRtree(geometries).query(geometries, predicate='intersects')
+    keep = left < right
+    left, right = left[keep], right[keep]
+    if len(left):
+        intersections = shapely.intersection(geometries[left], geometries[right])
+        overlap_areas = shapely.area(intersections)
+        real = overlap_areas > min_area
+        for a, b, area in zip(left[real].tolist(), right[real].tolist(), overlap_areas[real].tolist()):
+            report['overlaps'].append({'pieces': [piece_ids[present[a]], piece_ids[present[b]]], 'area': area})
+
+        parts = shapely.get_parts(intersections[real])
+        rings = shapely.get_exterior_ring(parts[shapely.get_type_id(parts) == 3])  # Polygon parts only
+        coordinates, ring_index = shapely.get_coordinates(rings, return_index=True)
+        boundaries = np.flatnonzero(np.diff(ring_index)) + 1
+        report['overlap_regions'] = [ring.tolist() for ring in np.split(coordinates, boundaries)] if len(coordinates) else []
+
+    # --- Parts crossing the bin rectangle ---
+    bin_box = shapely.box(0, 0, bin_dimension.width, bin_dimension.height)
+    outside_areas = shapely.area(shapely.difference(geometries, bin_box))
+    for i in np.flatnonzero(outside_areas > min_area).tolist():
+        report['out_of_bin'].append({'piece': piece_ids[present[i]], 'outside_area': float(outside_areas[i])})
+
+    return report
+
+
+def layout_bin(bin_info, original_pieces_data, font, seed=0, bin_dimension=None):
+    """
+    Computes everything needed to draw one bin: the placed vertices of every piece,
+    its fill color and its label strokes. The result only depends on the bin, the
+    problem geometry and the coloring seed, so it can be cached and redrawn without
+    recomputation. When `bin_dimension` is given, the placement is also checked with
+    validate_bin() and the report is stored under layout['validation'].
+    """
+    print(f"Drawing Bin {bin_info['number']}...")
+
+    # --- Pre-computation for coloring ---
+    all_final_vertices = []
+    all_polygons = []
+    for piece_info in bin_info['placed_pieces']:
+        piece_id = piece_info['id']
+        if piece_id not in original_pieces_data:
+            all_final_vertices.append(None)
+            all_polygons.append(None)
+            continue
+
+        # --- Transformation Logic ---
+        original_vertices, rotation_pivot = original_pieces_data[piece_id]
+        final_vertices = place_piece(original_vertices, rotation_pivot, piece_info['rotation'], piece_info['x'], piece_info['y'])
+
+        all_final_vertices.append(final_vertices)
+        polygon = Polygon(final_vertices)
+        if not polygon.is_valid:
+            polygon = polygon.buffer(0)
+        all_polygons.append(polygon)
+
+    # --- Adjacency Graph and Coloring ---
+    adjacency_list = build_adjacency(all_polygons)
+    color_indices = dsatur_coloring(adjacency_list, len(PASTEL_COLORS), seed=seed)
+    piece_to_color_map = {i: PASTEL_COLORS[k] for i, k in enumerate(color_indices)}
+
+    # --- Label Logic ---
+    # All labels of the bin are measured in one batch at unit scale.
+    label_widths = measure_strings(font, [str(piece_info['id']) for piece_info in bin_info['placed_pieces']], scale=1.0)
+    pieces = []
+    for i, piece_info in enumerate(bin_info['placed_pieces']):
+        final_vertices = all_final_vertices[i]
+        piece_id = piece_info['id']
+        if final_vertices is None:
+            print(f"  - Warning: Could not find original geometry for Piece ID: {piece_id}")
+            continue
+
+        final_centroid, size = most_inland_point(final_vertices, 10)
+        text = str(piece_id)
+        label_font = SizedFont(font, size / 80)
+        text_width = label_widths[i] * label_font.scale
+        x_offset = final_centroid[0] - text_width / 2
+        y_offset = final_centroid[1] - 10 * label_font.scale
+        label_paths = [[(p[0] + x_offset, p[1] + y_offset) for p in path] for path in label_font.get_string(text)]
+
+        # Fallback for any piece that wasn't colored (should not happen with current logic)
+        pieces.append({
+            'id': piece_id,
+            'index': i,
+            'vertices': final_vertices,
+            'color': piece_to_color_map.get(i, colors.grey),
+            'label_paths': label_paths,
+            'label_scale': label_font.scale,
+            'label_origin': (x_offset, y_offset),
+        })
+
+    layout = {'number': bin_info['number'], 'pieces': pieces}
+    if bin_dimension is not None:
+        piece_ids = [piece_info['id'] for piece_info in bin_info['placed_pieces']]
+        layout['validation'] = validate_bin(bin_info['number'], piece_ids, all_polygons, bin_dimension)
+        layout['validation']['labels_outside'] = [
+            piece['id'] for piece in pieces
+            if not get_outliner(font).fits_inside(all_polygons[piece['index']], str(piece['id']), pen_width=1.0,
+                                                  scale=piece['label_scale'], origin=piece['label_origin'])
+        ]
+    return layout
+
+
+def problem_piece_ids(layout):
+    """Ids of the pieces that overlap another piece or leave the bin, from layout['validation']."""
+    validation = layout.get('validation')
+    if not validation:
+        return set()
+    ids = {entry['piece'] for entry in validation['out_of_bin']}
+    for entry in validation['overlaps']:
+        ids.update(entry['pieces'])
+    return ids
+
+
+def draw_bin_page(c, bin_dimension, layout):
+    """Draws a bin layout produced by layout_bin() as one page of the canvas."""
+    c.setPageSize((bin_dimension.width + 50, bin_dimension.height + 50))
+    c.setStrokeColor(colors.lightgrey)
+    c.translate(25, 48)
+    c.rect(0, 0, bin_dimension.width, bin_dimension.height)
+
+    # --- Drawing Loop ---
+    for piece in layout['pieces']:
+        final_vertices = piece['vertices']
+
+        # --- Drawing Logic ---
+        p = c.beginPath()
+        p.moveTo(final_vertices[0][0], final_vertices[0][1])
+        for point in final_vertices[1:]:
+            p.lineTo(point[0], point[1])
+        p.close()
+
+        c.setFillColor(piece['color'])
+        c.setStrokeColor(colors.darkgrey)
+        c.setLineWidth(1)
+        c.drawPath(p, fill=1, stroke=1)
+
+        c.setFillColor(colors.black)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        for path in piece['label_paths']:
             p = c.beginPath()
-            p.moveTo(final_vertices[0][0], final_vertices[0][1])
-            for point in final_vertices[1:]:
+            p.moveTo(path[0][0], path[0][1])
+            for point in path[1:]:
                 p.lineTo(point[0], point[1])
-            p.close()
-            
-            # Assign color based on our new mapping.
-            if i in piece_to_color_map:
-                c.setFillColor(piece_to_color_map[i])
-            else:
-                # Fallback for any piece that wasn't colored (should not happen with current logic)
-                c.setFillColor(colors.grey)
-            c.setStrokeColor(colors.darkgrey)
-            c.setLineWidth(1)
-            c.drawPath(p, fill=1, stroke=1)
-
-            final_centroid, size = most_inland_point(final_vertices, 10)
-            c.setFillColor(colors.black)
-            
-            text = str(piece_id)
-            font.scale = size / 80
-            text_width = font.get_string_length(text)
-            paths = font.get_string(text)
-            c.setStrokeColor(colors.black)
-            c.setLineWidth(1)
-            x_offset = final_centroid[0] - text_width / 2
-            y_offset = final_centroid[1] - 10 * font.scale
-
-            for path in paths:
+            c.drawPath(p)
+
+    # --- Validation Highlights ---
+    if layout.get('highlight'):
+        problem_ids = problem_piece_ids(layout)
+        c.setStrokeColor(colors.red)
+        c.setLineWidth(2)
+        for piece in layout['pieces']:
+            if piece['id'] in problem_ids:
                 p = c.beginPath()
-                p.moveTo(path[0][0] + x_offset, path[0][1] + y_offset)
-                for point in path[1:]:
-                    p.lineTo(point[0] + x_offset, point[1] + y_offset)
+                p.moveTo(piece['vertices'][0][0], piece['vertices'][0][1])
+                for point in piece['vertices'][1:]:
+                    p.lineTo(point[0], point[1])
+                p.close()
                 c.drawPath(p)
+        c.setFillColor(colors.Color(1, 0, 0, alpha=0.6))
+        for region in layout['validation']['overlap_regions']:
+            p = c.beginPath()
+            p.moveTo(region[0][0], region[0][1])
+            for point in region[1:]:
+                p.lineTo(point[0], point[1])
+            p.close()
+            c.drawPath(p, fill=1, stroke=0)
+
+    c.showPage()
+
+
+def encode_bin_page(bin_dimension, layout):
+    """
+    Renders a bin layout with the direct PDF writer and returns the compressed page.
+    Produces the same drawing as draw_bin_page() without reportlab's per-path objects.
+    """
+    page = PDFPage(bin_dimension.width + 50, bin_dimension.height + 50)
+    page.translate(25, 48)
+    page.set_stroke_rgb(colors.lightgrey.rgb())
+    page.rect(0, 0, bin_dimension.width, bin_dimension.height)
 
-        c.showPage()
+    # Label strokes are collected per piece and drawn right after it, as in draw_bin_page().
+    darkgrey, black = colors.darkgrey.rgb(), colors.black.rgb()
+    for piece in layout['pieces']:
+        color = piece['color']
+        page.set_fill_rgb(color.rgb())
+        page.set_fill_alpha(color.alpha)
+        page.set_stroke_rgb(darkgrey)
+        page.polygon(piece['vertices'])
+
+        page.set_stroke_rgb(black)
+        for path in piece['label_paths']:
+            page.polyline(path)
+
+    # --- Validation Highlights ---
+    if layout.get('highlight'):
+        problem_ids = problem_piece_ids(layout)
+        page.set_stroke_rgb(colors.red.rgb())
+        page.set_line_width(2)
+        for piece in layout['pieces']:
+            if piece['id'] in problem_ids:
+                page.polygon(piece['vertices'], fill=False)
+        page.set_fill_rgb(colors.red.rgb())
+        page.set_fill_alpha(0.6)
+        for region in layout['validation']['overlap_regions']:
+            page.polygon(region, stroke=False)
+
+    return page.encode()
+
+
+def write_pages_pdf(pages, file_name):
+    """Writes pages encoded by encode_bin_page() to a PDF, one page at a time."""
+    print(f"Writing PDF to {file_name}...")
+    with PDFWriter(file_name) as pdf:
+        for page in pages:
+            pdf.add_page(page)
+    print("PDF saved successfully.")
+
+
+def write_layouts_pdf(layouts, bin_dimension, file_name, backend='reportlab'):
+    """
+    Assembles bin layouts into a multi-page PDF, either through reportlab or through
+    the lightweight writer in pdf_writer.py (backend='direct'). `layouts` may be a
+    generator; each layout is drawn and released before the next one is requested.
+    With the direct backend every page is also flushed to disk as soon as it is
+    drawn, while reportlab keeps the whole document in memory until it is saved.
+    Returns the number of pages written.
+    """
+    page_count = 0
+    if backend == 'direct':
+        def pages():
+            nonlocal page_count
+            for layout in layouts:
+                page_count += 1
+                yield encode_bin_page(bin_dimension, layout)
+        write_pages_pdf(pages(), file_name)
+        return page_count
+
+    c = canvas.Canvas(file_name, pagesize=(bin_dimension.width + 50, bin_dimension.height + 50))
+    for layout in layouts:
+        draw_bin_page(c, bin_dimension, layout)
+        page_count += 1
 
     print(f"\nSaving PDF to {file_name}...")
     c.save()
     print("PDF saved successfully.")
+    return page_count
+
+
+def create_packing_visual_pdf(bins_data, bin_dimension, original_pieces_data, file_name="nesting_visualization_from_files.pdf", seed=0, backend='reportlab',
+                              preview_file=None, preview_scale=0.25, report_file=None, highlight=False):
+    """
+    Creates a PDF visualizing the nesting result by reading placement from files.
+    The piece colors only depend on the layout and `seed`.
+
+    `bins_data` can be a list or a generator such as iter_bins(); bins are laid out
+    and drawn one at a time, so with the direct backend peak memory depends on the
+    largest bin rather than on the number of bins. If `preview_file` is given, a PNG
+    contact sheet of the same layouts is written as well (see create_preview_png).
+
+    If `report_file` is given, every bin is validated while it is laid out and a JSON
+    report of overlaps, out-of-bin parts and utilisation is written (see
+    write_validation_report); `highlight` marks those problems in red in the PDF.
+    Returns the number of pages drawn.
+    """
+    layouts = iter_layouts(bins_data, bin_dimension, original_pieces_data, seed=seed,
+                           validate=report_file is not None or highlight, highlight=highlight)
+    reports = []
+    if report_file is not None:
+        layouts = collect_validation(layouts, reports)
+    if preview_file is None:
+        page_count = write_layouts_pdf(layouts, bin_dimension, file_name, backend=backend)
+        if report_file is not None:
+            write_validation_report(reports, report_file)
+        return page_count
+
+    tiles, captions = [], []
+    def previewed(layouts):
+        for layout in layouts:
+            # Kept as 8-bit tiles: float64 previews of hundreds of bins would not fit in memory.
+            tiles.append(to_uint8(render_bin_preview(bin_dimension, layout, scale=preview_scale)))
+            captions.append(f"Bin {layout['number']}")
+            yield layout
+    page_count = write_layouts_pdf(previewed(layouts), bin_dimension, file_name, backend=backend)
+    if tiles:
+        save_preview(tiles, captions, preview_file)
+    if report_file is not None:
+        write_validation_report(reports, report_file)
+    return page_count
+
+
+def iter_layouts(bins_data, bin_dimension, original_pieces_data, seed=0, validate=False, highlight=False):
+    """Lays out bins one at a time, optionally validating them and flagging them for highlighting."""
+    font = Romans()
+    for bin_info in bins_data:
+        layout = layout_bin(bin_info, original_pieces_data, font, seed=seed,
+                            bin_dimension=bin_dimension if validate else None)
+        if highlight:
+            layout['highlight'] = True
+        yield layout
+
+
+def validation_report(layout):
+    """The validation report of a layout without the drawing-only regions; warns if the bin has problems."""
+    validation = dict(layout['validation'])
+    del validation['overlap_regions']
+    if validation['overlaps'] or validation['out_of_bin']:
+        print(f"  - Warning: Bin {layout['number']} has {len(validation['overlaps'])} overlapping pair(s) "
+              f"and {len(validation['out_of_bin'])} part(s) outside the bin.")
+    return validation
+
+
+def collect_validation(layouts, reports):
+    """Passes layouts through while appending their validation reports."""
+    for layout in layouts:
+        reports.append(validation_report(layout))
+        yield layout
+
+
+def write_validation_report(reports, file_name):
+    """Writes the per-bin validation reports and a job summary as JSON."""
+    total_bin_area = sum(report['bin_area'] for report in reports)
+    total_used_area = sum(report['used_area'] for report in reports)
+    summary = {
+        'bins': len(reports),
+        'pieces': sum(report['piece_count'] for report in reports),
+        'overlapping_pairs': sum(len(report['overlaps']) for report in reports),
+        'out_of_bin_parts': sum(len(report['out_of_bin']) for report in reports),
+        'missing_pieces': sum(len(report['missing_pieces']) for report in reports),
+        'utilisation': total_used_area / total_bin_area if total_bin_area else 0.0,
+        'labels_outside': sum(len(report.get('labels_outside', [])) for report in reports),
+        'valid': all(not report['overlaps'] and not report['out_of_bin'] for report in reports),
+    }
+    with open(file_name, 'w') as f:
+        json.dump({'summary': summary, 'bins': reports}, f, indent=2)
+    print(f"Validation report saved to {file_name} ({'valid' if summary['valid'] else 'problems found'}).")
+
+
+def save_preview(tiles, captions, file_name):
+    """Saves preview tiles as a single PNG, as a contact sheet when there are several bins."""
+    image = tiles[0] if len(tiles) == 1 else make_contact_sheet(tiles, captions)
+    save_png(image, file_name)
+    print(f"Preview saved to {file_name}.")
+
+
+def create_preview_png(bins_data, bin_dimension, original_pieces_data, file_name="nesting_preview.png", seed=0, scale=0.25,
+                       report_file=None):
+    """
+    Renders a downscaled raster preview of the nesting result without producing the
+    PDF. Bins are rasterized with NumPy at `scale` pixels per bin unit and tiled into a
+    contact sheet; colors use the same `seed` as the PDF, so both match. A validation
+    report is written to `report_file` if given. Returns the number of bins rendered.
+    """
+    layouts = iter_layouts(bins_data, bin_dimension, original_pieces_data, seed=seed, validate=report_file is not None)
+    reports = []
+    if report_file is not None:
+        layouts = collect_validation(layouts, reports)
+    tiles, captions = [], []
+    for layout in layouts:
+        tiles.append(to_uint8(render_bin_preview(bin_dimension, layout, scale=scale)))
+        captions.append(f"Bin {layout['number']}")
+    if tiles:
+        save_preview(tiles, captions, file_name)
+    if report_file is not None:
+        write_validation_report(reports, report_file)
+    return len(tiles)
+
+
+class BinPageCache:
+    """
+    Keeps the encoded PDF page of every Bin-*.txt file together with the file's
+    modification time and content hash, so that only changed bins are laid out again
+    and the document can be reassembled by the direct writer without redrawing. The
+    layouts themselves are dropped once encoded, so memory follows the compressed pages.
+
+    With `validate` (or `highlight`, which needs the validation) every changed bin is
+    also checked against the bin_dimension and its report is cached with the page.
+    """
+
+    def __init__(self, bin_dimension, original_pieces_data, seed=0, validate=False, highlight=False):
+        self.bin_dimension = bin_dimension
+        self.original_pieces_data = original_pieces_data
+        self.seed = seed
+        self.validate = validate or highlight
+        self.highlight = highlight
+        self.font = Romans()
+        self.entries = {}  # Maps bin file path to (mtime_ns, sha1, bin number, encoded page, validation report)
+
+    def refresh(self, bin_files):
+        """
+        Brings the cache in line with the given bin files. Returns True if any
+        page was added, changed or removed since the previous refresh.
+        """
+        changed = False
+        for bin_file in list(self.entries):
+            if bin_file not in bin_files:
+                del self.entries[bin_file]
+                changed = True
+
+        for bin_file in bin_files:
+            try:
+                mtime_ns = os.stat(bin_file).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            entry = self.entries.get(bin_file)
+            if entry is not None and entry[0] == mtime_ns:
+                continue
+
+            try:
+                with open(bin_file, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+                if entry is not None and entry[1] == digest:
+                    # Touched but not rewritten with new content: keep the cached page.
+                    self.entries[bin_file] = (mtime_ns, digest) + entry[2:]
+                    continue
+                bin_info = parse_bin_file(bin_file)
+            except (OSError, ValueError, IndexError) as e:
+                # Most likely still being written by the solver. Keep the previous entry and
+                # do not record this version, so the file is read again on the next poll.
+                print(f"  - Warning: Could not read {bin_file} ({e}); will retry.")
+                continue
+
+            number, page, report = None, None, None
+            if bin_info:
+                layout = layout_bin(bin_info, self.original_pieces_data, self.font, seed=self.seed,
+                                    bin_dimension=self.bin_dimension if self.validate else None)
+                if self.validate:
+                    report = validation_report(layout)
+                if self.highlight:
+                    layout['highlight'] = True
+                number, page = layout['number'], encode_bin_page(self.bin_dimension, layout)
+            self.entries[bin_file] = (mtime_ns, digest, number, page, report)
+            changed = True
+        return changed
+
+    def pages(self):
+        """Returns the cached encoded pages ordered by bin number."""
+        entries = sorted((entry for entry in self.entries.values() if entry[3] is not None), key=lambda entry: entry[2])
+        return [entry[3] for entry in entries]
+
+    def reports(self):
+        """Returns the cached validation reports ordered by bin number."""
+        entries = sorted((entry for entry in self.entries.values() if entry[4] is not None), key=lambda entry: entry[2])
+        return [entry[4] for entry in entries]
+
+
+def watch_bins(bin_dimension, original_pieces_data, file_name, interval=1.0, seed=0, directory='.', bins=None,
+               report_file=None, highlight=False):
+    """
+    Watches the Bin-*.txt files in a directory (only those of the `bins` numbers, if
+    given) and rewrites the PDF whenever one of them changes. Only the changed bins
+    are laid out and encoded again; the encoded pages of the other bins are reused
+    from the cache, so reassembling the PDF with the direct writer only copies bytes.
+    Files that cannot be parsed yet (e.g. half-written ones) are retried on the next poll.
+    The validation report (`report_file`) and the `highlight` marks are kept up to date the same way.
+    """
+    cache = BinPageCache(bin_dimension, original_pieces_data, seed=seed,
+                         validate=report_file is not None, highlight=highlight)
+    print(f"Watching for changes in Bin-*.txt (every {interval}s, Ctrl+C to stop)...")
+    try:
+        while True:
+            if cache.refresh(find_bin_files(directory, bins)):
+                pages = cache.pages()
+                if pages:
+                    write_pages_pdf(pages, file_name)
+                    if report_file is not None:
+                        write_validation_report(cache.reports(), report_file)
+                else:
+                    print("No packing data found yet, waiting...")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
 
 
 def main():
     print("--- Visualizing Nesting from Bin Files ---")
-    
-    if len(sys.argv) < 2:
-        print("Usage: python visual_vector.py <original_problem_file>")
-        print("Example: python visual_vector.py samples/S266.txt")
-        sys.exit(1)
-        
-    input_file = sys.argv[1]
-        
+
+    parser = argparse.ArgumentParser(
+        description="Creates a PDF of a nesting result from Bin-*.txt files.",
+        epilog="Example: python visual_vector.py samples/S266.txt",
+    )
+    parser.add_argument("input_file", help="original problem file")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the problem file as text instead of using its compiled .npz cache")
+    parser.add_argument("--bins-dir", default=".",
+                        help="directory containing the Bin-*.txt files (default: current directory)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-render whenever a Bin-*.txt file changes (pages are cached "
+                             "and written with the direct PDF writer)")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="polling interval in seconds for --watch (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the piece coloring, the same seed gives the same colors (default: 0)")
+    parser.add_argument("--backend", choices=["reportlab", "direct"], default="reportlab",
+                        help="PDF backend; 'direct' streams compressed pages without reportlab and is much "
+                             "faster on large jobs (default: reportlab)")
+    parser.add_argument("--preview", metavar="PNG",
+                        help="also write a raster preview (a contact sheet of all bins) to this PNG file")
+    parser.add_argument("--preview-scale", type=float, default=0.25,
+                        help="preview resolution in pixels per bin unit (default: 0.25)")
+    parser.add_argument("--preview-only", action="store_true",
+                        help="only write the --preview PNG and skip the PDF")
+    parser.add_argument("--report", metavar="JSON",
+                        help="validate the placement (overlaps, parts outside the bin, utilisation) and write a JSON report")
+    parser.add_argument("--highlight", action="store_true",
+                        help="mark overlapping and out-of-bin parts in red in the PDF")
+    parser.add_argument("--bins", metavar="LIST",
+                        help="only render these bins, e.g. 3,5,10-20; only their files and the pieces they "
+                             "place are read")
+    args = parser.parse_args()
+    if args.preview_only and not args.preview:
+        parser.error("--preview-only requires --preview")
+    if args.watch and args.preview:
+        parser.error("--preview cannot be used with --watch")
+    selection = None
+    if args.bins:
+        try:
+            selection = parse_bin_selection(args.bins)
+        except ValueError as e:
+            parser.error(str(e))
+
+    input_file = args.input_file
+    output_filename = "nesting_visualization_from_files.pdf"
+
+    # With a bin selection the selected bins are read first, so that only the pieces
+    # they place are loaded from the problem file.
+    bins_data = None
+    piece_ids = None
+    if selection is not None and not args.watch:
+        print("\nSearching for the selected packing result files (Bin-*.txt)...")
+        bin_files = find_bin_files(args.bins_dir, selection)
+        missing = sorted(selection - {bin_number_from_path(f) for f in bin_files})
+        if missing:
+            shown = ', '.join(str(n) for n in missing[:10]) + (', ...' if len(missing) > 10 else '')
+            print(f"  - Warning: {len(missing)} selected bin(s) not found: {shown}")
+        if not bin_files:
+            print("\n[ERROR] None of the selected bins were found. Cannot generate PDF.")
+            print(f"Please check the --bins selection and the files in: {os.path.abspath(args.bins_dir)}")
+            sys.exit(1)
+        print(f"Found {len(bin_files)} selected bin result file(s).")
+        bins_data = list(iter_bins(bin_files))
+        piece_ids = referenced_piece_ids(bins_data)
+
     try:
-        bin_dimension, original_pieces_data = parse_problem_file(input_file)
+        bin_dimension, original_pieces_data = load_problem(input_file, use_cache=not args.no_cache, piece_ids=piece_ids)
     except FileNotFoundError:
         print(f"Error: Original problem file not found at '{input_file}'")
         sys.exit(1)
 
-    print(f"Loaded {len(original_pieces_data)} original piece geometries from {input_file}.")
+    if piece_ids is None:
+        print(f"Loaded {len(original_pieces_data)} original piece geometries from {input_file}.")
+    else:
+        print(f"Loaded the {len(piece_ids)} piece geometries used by the selected bins from {input_file}.")
     print(f"Bin dimensions: {bin_dimension.width}x{bin_dimension.height}")
 
-    print("\nSearching for packing result files (Bin-*.txt)...")
-    bins_data = parse_bin_files()
-    if not bins_data:
-        print("\n[ERROR] No packing data found. Cannot generate PDF.")
-        print("Reason: No files matching 'Bin-*.txt' were found, or the files were empty/malformed.")
-        print(f"Please ensure that the packing result files (e.g., 'Bin-1.txt') are present in the current working directory: {os.getcwd()}")
-        sys.exit(1)
-    print(f"Found and parsed {len(bins_data)} bin result file(s).")
+    if args.watch:
+        watch_bins(bin_dimension, original_pieces_data, output_filename, interval=args.interval, seed=args.seed,
+                   directory=args.bins_dir, bins=selection, report_file=args.report, highlight=args.highlight)
+        return
 
-    output_filename = "nesting_visualization_from_files.pdf"
-    create_packing_visual_pdf(bins_data, bin_dimension, original_pieces_data, file_name=output_filename)
+    if bins_data is None:
+        print("\nSearching for packing result files (Bin-*.txt)...")
+        bin_files = find_bin_files(args.bins_dir)
+        if not bin_files:
+            print("\n[ERROR] No packing data found. Cannot generate PDF.")
+            print("Reason: No files matching 'Bin-*.txt' were found.")
+            print(f"Please ensure that the packing result files (e.g., 'Bin-1.txt') are present in: {os.path.abspath(args.bins_dir)}")
+            sys.exit(1)
+        print(f"Found {len(bin_files)} bin result file(s).")
+        bins_data = iter_bins(bin_files)
+
+    if args.preview_only:
+        page_count = create_preview_png(bins_data, bin_dimension, original_pieces_data,
+                                        file_name=args.preview, seed=args.seed, scale=args.preview_scale,
+                                        report_file=args.report)
+    else:
+        page_count = create_packing_visual_pdf(bins_data, bin_dimension, original_pieces_data,
+                                               file_name=output_filename, seed=args.seed, backend=args.backend,
+                                               preview_file=args.preview, preview_scale=args.preview_scale,
+                                               report_file=args.report, highlight=args.highlight)
+    if not page_count:
+        print("\n[WARNING] All bin result files were empty or malformed; the PDF has no pages.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()